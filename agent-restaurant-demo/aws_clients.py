@@ -0,0 +1,83 @@
+"""
+Process-wide AWS clients
+
+boto3 and Bedrock streaming clients are expensive to build (service model
+loading, endpoint resolution, TLS handshakes), so each worker builds them
+once and every call shares their connection pools.
+"""
+import asyncio
+import logging
+import os
+import threading
+
+from botocore.config import Config as BotocoreConfig
+
+from credentials import credential_provider
+
+logger = logging.getLogger(__name__)
+
+AWS_REGION = os.getenv("AWS_DEFAULT_REGION", "us-east-1")
+CLIENT_CONFIG = BotocoreConfig(
+    max_pool_connections=int(os.getenv("AWS_MAX_POOL_CONNECTIONS", "50")),
+    retries={"max_attempts": 3, "mode": "standard"},
+    tcp_keepalive=True
+)
+STARTUP_SERVICES = ("logs", "secretsmanager")
+
+
+class AWSClients:
+    """Builds each client once per process and hands out the shared instance"""
+
+    def __init__(self):
+        self._sessions = {}
+        self._clients = {}
+        self._bedrock = {}
+        self._lock = threading.Lock()
+
+    async def start(self, services=STARTUP_SERVICES, region=AWS_REGION):
+        """Build the clients calls will need off the event loop"""
+        await asyncio.to_thread(lambda: [self.client(service, region) for service in services])
+        self.bedrock_runtime(region)
+
+    def session(self, region=AWS_REGION):
+        """Shared boto3 session whose credentials follow the credential provider"""
+        session = self._sessions.get(region)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(region)
+                if session is None:
+                    session = self._sessions[region] = credential_provider.boto3_session(region)
+        return session
+
+    def client(self, service, region=AWS_REGION):
+        """Shared boto3 client with pooled connections (boto3 clients are thread-safe)"""
+        key = (service, region)
+        client = self._clients.get(key)
+        if client is None:
+            session = self.session(region)
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = self._clients[key] = session.client(service, config=CLIENT_CONFIG)
+                    logger.info(f"Created {service} client for {region}")
+        return client
+
+    def bedrock_runtime(self, region=AWS_REGION):
+        """Shared Bedrock bidirectional streaming client"""
+        client = self._bedrock.get(region)
+        if client is None:
+            from aws_sdk_bedrock_runtime.client import BedrockRuntimeClient
+            from aws_sdk_bedrock_runtime.config import Config, HTTPAuthSchemeResolver, SigV4AuthScheme
+
+            config = Config(
+                endpoint_uri=f"https://bedrock-runtime.{region}.amazonaws.com",
+                region=region,
+                aws_credentials_identity_resolver=credential_provider.identity_resolver(),
+                auth_scheme_resolver=HTTPAuthSchemeResolver(),
+                auth_schemes={"aws.auth#sigv4": SigV4AuthScheme(service="bedrock")}
+            )
+            client = self._bedrock[region] = BedrockRuntimeClient(config=config)
+        return client
+
+
+aws_clients = AWSClients()
@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+
+import boto3
+import botocore.session
+import requests
+from botocore.credentials import Credentials, RefreshableCredentials
+from requests.exceptions import RequestException
+
+from metrics import CallbackMetric
+
+logger = logging.getLogger(__name__)
+
+IMDS_ENDPOINT = os.getenv("AWS_EC2_METADATA_SERVICE_ENDPOINT", "http://169.254.169.254").rstrip("/")
+IMDS_TIMEOUT = float(os.getenv("IMDS_TIMEOUT", "2"))
+# botocore refuses credentials that expire within 10 minutes, so refresh
+# comfortably before its 15 minute advisory window.
+REFRESH_MARGIN = float(os.getenv("CREDENTIAL_REFRESH_MARGIN", "1200"))
+MIN_REFRESH_INTERVAL = 60
+MAX_REFRESH_INTERVAL = 3600
+RETRY_INTERVAL = 30
+
+
+class CredentialProvider:
+    """Holds AWS credentials in memory and refreshes them ahead of expiry off the event loop"""
+
+    def __init__(self):
+        self.credentials = None
+        self.source = None
+        self._identity = None
+        self._refresh_task = None
+        self._http = requests.Session()
+        self.stats = {"refreshes": 0, "failures": 0}
+
+    async def start(self):
+        """Load initial credentials and start the background refresh"""
+        await self.refresh()
+        if self.credentials and self.credentials.get("Expiration"):
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+        return self.credentials is not None
+
+    async def stop(self):
+        if self._refresh_task and not self._refresh_task.done():
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+
+    async def refresh(self):
+        """Fetch credentials in a worker thread so the loop keeps serving audio"""
+        try:
+            source, credentials = await asyncio.to_thread(self._resolve)
+        except Exception as e:
+            self.stats["failures"] += 1
+            logger.error(f"❌ Failed to fetch credentials: {e}")
+            return False
+        self.source = source
+        self.credentials = credentials
+        self._identity = None
+        self.stats["refreshes"] += 1
+        logger.info(f"✅ Credentials loaded from {source}, expires: {credentials.get('Expiration')}")
+        return True
+
+    def _resolve(self):
+        if os.getenv("AWS_ACCESS_KEY_ID") and os.getenv("AWS_SECRET_ACCESS_KEY"):
+            return "environment", {
+                "AccessKeyId": os.environ["AWS_ACCESS_KEY_ID"],
+                "SecretAccessKey": os.environ["AWS_SECRET_ACCESS_KEY"],
+                "Token": os.getenv("AWS_SESSION_TOKEN"),
+                "Expiration": None
+            }
+        try:
+            return "imds", self._fetch_from_imds()
+        except (RequestException, RuntimeError) as e:
+            logger.info(f"IMDS unavailable ({e}), falling back to the default credential chain")
+        credentials = boto3.Session().get_credentials()
+        if credentials is None:
+            raise RuntimeError("No AWS credentials found")
+        expiry = getattr(credentials, "_expiry_time", None)
+        frozen = credentials.get_frozen_credentials()
+        return "default chain", {
+            "AccessKeyId": frozen.access_key,
+            "SecretAccessKey": frozen.secret_key,
+            "Token": frozen.token,
+            "Expiration": expiry.isoformat() if expiry else None
+        }
+
+    def _fetch_from_imds(self):
+        token_response = self._http.put(
+            f"{IMDS_ENDPOINT}/latest/api/token",
+            headers={"X-aws-ec2-metadata-token-ttl-seconds": "21600"},
+            timeout=IMDS_TIMEOUT
+        )
+        headers = {"X-aws-ec2-metadata-token": token_response.text} if token_response.status_code == 200 else {}
+
+        role_response = self._http.get(
+            f"{IMDS_ENDPOINT}/latest/meta-data/iam/security-credentials/",
+            headers=headers, timeout=IMDS_TIMEOUT
+        )
+        if role_response.status_code != 200:
+            raise RuntimeError(f"Failed to retrieve IAM role name: HTTP {role_response.status_code}")
+        role_name = role_response.text.strip()
+
+        creds_response = self._http.get(
+            f"{IMDS_ENDPOINT}/latest/meta-data/iam/security-credentials/{role_name}",
+            headers=headers, timeout=IMDS_TIMEOUT
+        )
+        if creds_response.status_code != 200:
+            raise RuntimeError(f"Failed to retrieve credentials: HTTP {creds_response.status_code}")
+        credentials = creds_response.json()
+        return {
+            "AccessKeyId": credentials.get("AccessKeyId"),
+            "SecretAccessKey": credentials.get("SecretAccessKey"),
+            "Token": credentials.get("Token"),
+            "Expiration": credentials.get("Expiration")
+        }
+
+    def expiration(self):
+        expiration = self.credentials and self.credentials.get("Expiration")
+        if not expiration:
+            return None
+        return datetime.fromisoformat(expiration.replace("Z", "+00:00"))
+
+    def seconds_until_refresh(self):
+        try:
+            remaining = (self.expiration() - datetime.now(timezone.utc)).total_seconds()
+        except Exception:
+            return MAX_REFRESH_INTERVAL
+        return min(max(remaining - REFRESH_MARGIN, MIN_REFRESH_INTERVAL), MAX_REFRESH_INTERVAL)
+
+    async def _refresh_loop(self):
+        logger.info("Starting credential refresh background task")
+        retry_interval = RETRY_INTERVAL
+        while True:
+            try:
+                await asyncio.sleep(self.seconds_until_refresh())
+                while not await self.refresh():
+                    await asyncio.sleep(retry_interval)
+                    retry_interval = min(retry_interval * 2, 300)
+                retry_interval = RETRY_INTERVAL
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in credential refresh: {e}")
+                await asyncio.sleep(RETRY_INTERVAL)
+
+    def identity_resolver(self):
+        """Smithy identity resolver for the Bedrock bidirectional streaming client"""
+        return _ProviderIdentityResolver(self)
+
+    def boto3_session(self, region=None):
+        """boto3 session whose credentials follow this provider without touching os.environ"""
+        if self.credentials is None:
+            return boto3.Session(region_name=region)
+        botocore_session = botocore.session.get_session()
+        if self.credentials.get("Expiration"):
+            botocore_session._credentials = RefreshableCredentials.create_from_metadata(
+                metadata=self._as_metadata(),
+                refresh_using=self._as_metadata,
+                method="credential-provider"
+            )
+        else:
+            botocore_session._credentials = Credentials(
+                self.credentials["AccessKeyId"],
+                self.credentials["SecretAccessKey"],
+                self.credentials["Token"]
+            )
+        return boto3.Session(botocore_session=botocore_session, region_name=region)
+
+    def _as_metadata(self):
+        # Called by botocore from whatever thread makes the request; the
+        # background task keeps the in-memory copy fresh, so no I/O here.
+        return {
+            "access_key": self.credentials["AccessKeyId"],
+            "secret_key": self.credentials["SecretAccessKey"],
+            "token": self.credentials["Token"],
+            "expiry_time": self.expiration().isoformat()
+        }
+
+
+class _ProviderIdentityResolver:
+    """Adapts CredentialProvider to the smithy IdentityResolver interface"""
+
+    def __init__(self, provider):
+        self.provider = provider
+
+    async def get_identity(self, **kwargs):
+        from smithy_aws_core.identity import AWSCredentialsIdentity
+
+        provider = self.provider
+        if provider.credentials is None:
+            await provider.refresh()
+        if provider.credentials is None:
+            raise RuntimeError("No AWS credentials available")
+        if provider._identity is None:
+            provider._identity = AWSCredentialsIdentity(
+                access_key_id=provider.credentials["AccessKeyId"],
+                secret_access_key=provider.credentials["SecretAccessKey"],
+                session_token=provider.credentials["Token"],
+                expiration=provider.expiration()
+            )
+        return provider._identity
+
+
+credential_provider = CredentialProvider()
+
+CallbackMetric("voice_credential_refreshes_total", "AWS credential refresh attempts by result",
+               lambda: {("success",): credential_provider.stats["refreshes"],
+                        ("failure",): credential_provider.stats["failures"]},
+               labelnames=("result",), metric_type="counter")
@@ -0,0 +1,185 @@
+"""
+Table inventory per slot, built once from restaurant_data.SLOT_TABLES
+
+Each slot holds this worker's free tables by capacity, and each
+(date, capacity) keeps a sorted list of the slot times that still have
+such a table free. A lookup for a party checks only the capacities that
+seat it, and the nearest alternative times come from a bisect into those
+lists instead of a scan of the day. Bookings take a hold on the smallest
+table that fits and then commit it; the check and the decrement happen
+under one lock, so concurrent callers cannot book the same table. Holds
+not committed within HOLD_TTL seconds go back to the inventory.
+"""
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left, insort
+
+from metrics import CallbackMetric
+from restaurant_data import SLOT_TABLES
+
+logger = logging.getLogger(__name__)
+
+HOLD_TTL = float(os.getenv("HOLD_TTL", "120"))
+
+
+def to_minutes(hhmm):
+    """Minutes after midnight for "HH:MM", else None"""
+    try:
+        hours, minutes = hhmm.split(":")
+        return int(hours) * 60 + int(minutes)
+    except (AttributeError, ValueError):
+        return None
+
+
+def to_hhmm(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class SlotInventory:
+    """Free tables by slot and capacity, with sorted per-capacity slot indexes and atomic holds"""
+
+    def __init__(self, slot_tables, hold_ttl=HOLD_TTL):
+        self.hold_ttl = hold_ttl
+        self._lock = threading.Lock()
+        self._free = {}   # (date, minutes) -> {capacity: free tables}
+        self._times = {}  # date -> sorted minutes of every slot
+        self._open = {}   # (date, capacity) -> sorted minutes with such a table free
+        self._holds = {}  # hold id -> (date, minutes, capacity, expires)
+        self._expiry = []  # heap of (expires, hold id)
+        self._ids = itertools.count(1)
+        capacities = set()
+        for date, slots in slot_tables.items():
+            self._times[date] = sorted(to_minutes(t) for t in slots)
+            for slot_time, tables in slots.items():
+                minutes = to_minutes(slot_time)
+                self._free[date, minutes] = dict(tables)
+                for capacity, count in tables.items():
+                    capacities.add(capacity)
+                    if count > 0:
+                        insort(self._open.setdefault((date, capacity), []), minutes)
+        self.capacities = sorted(capacities)
+        self.stats = {"held": 0, "committed": 0, "released": 0, "expired": 0, "rejected": 0}
+
+    def has_date(self, date):
+        return date in self._times
+
+    def has_slot(self, date, hhmm):
+        return (date, to_minutes(hhmm)) in self._free
+
+    def largest_table(self):
+        return self.capacities[-1] if self.capacities else 0
+
+    def times(self, date):
+        return [to_hhmm(m) for m in self._times.get(date, ())]
+
+    def _fitting(self, party_size):
+        return self.capacities[bisect_left(self.capacities, party_size):]
+
+    def available(self, date, hhmm, party_size):
+        """Free tables at the slot that seat the party"""
+        self._expire()
+        free = self._free.get((date, to_minutes(hhmm)), {})
+        return sum(free.get(c, 0) for c in self._fitting(party_size))
+
+    def nearest(self, date, hhmm, party_size, n=3):
+        """Up to n other slot times, nearest first, with a free table that seats the party"""
+        self._expire()
+        target = to_minutes(hhmm)
+        if target is None:
+            return []
+        candidates = set()
+        for capacity in self._fitting(party_size):
+            times = self._open.get((date, capacity), ())
+            i = bisect_left(times, target)
+            # The n nearest on either side of the target cover the n nearest overall
+            candidates.update(times[max(0, i - n):i + n + 1])
+        candidates.discard(target)
+        return [to_hhmm(m) for m in sorted(candidates, key=lambda m: (abs(m - target), m))[:n]]
+
+    def nearest_slots(self, date, hhmm, n=3):
+        """Up to n slot times of the day nearest to an unknown time, open or not"""
+        times = self._times.get(date, [])
+        target = to_minutes(hhmm)
+        if target is None:
+            return [to_hhmm(m) for m in times[:n]]
+        i = bisect_left(times, target)
+        return [to_hhmm(m) for m in sorted(times[max(0, i - n):i + n], key=lambda m: (abs(m - target), m))[:n]]
+
+    def hold(self, date, hhmm, party_size):
+        """Take the smallest free table that seats the party; returns a hold id, or None if there is none"""
+        if party_size < 1:
+            raise ValueError(f"Party size must be at least 1, got {party_size}")
+        minutes = to_minutes(hhmm)
+        with self._lock:
+            self._expire_locked()
+            free = self._free.get((date, minutes))
+            if free is not None:
+                for capacity in self._fitting(party_size):
+                    if free.get(capacity, 0) > 0:
+                        self._take(date, minutes, capacity)
+                        hold_id = f"H{next(self._ids)}"
+                        expires = time.monotonic() + self.hold_ttl
+                        self._holds[hold_id] = (date, minutes, capacity, expires)
+                        heapq.heappush(self._expiry, (expires, hold_id))
+                        self.stats["held"] += 1
+                        return hold_id
+            self.stats["rejected"] += 1
+            return None
+
+    def commit(self, hold_id):
+        """Make a hold permanent; False if it already expired or was released"""
+        with self._lock:
+            if self._holds.pop(hold_id, None) is None:
+                return False
+            self.stats["committed"] += 1
+            return True
+
+    def release(self, hold_id):
+        """Return a held table to the inventory"""
+        with self._lock:
+            hold = self._holds.pop(hold_id, None)
+            if hold is not None:
+                self._give_back(*hold[:3])
+                self.stats["released"] += 1
+
+    def table_of(self, hold_id):
+        hold = self._holds.get(hold_id)
+        return hold[2] if hold else None
+
+    def _take(self, date, minutes, capacity):
+        free = self._free[date, minutes]
+        free[capacity] -= 1
+        if free[capacity] == 0:
+            times = self._open[date, capacity]
+            del times[bisect_left(times, minutes)]
+
+    def _give_back(self, date, minutes, capacity):
+        free = self._free[date, minutes]
+        free[capacity] = free.get(capacity, 0) + 1
+        if free[capacity] == 1:
+            insort(self._open.setdefault((date, capacity), []), minutes)
+
+    def _expire(self):
+        if self._expiry and self._expiry[0][0] <= time.monotonic():
+            with self._lock:
+                self._expire_locked()
+
+    def _expire_locked(self):
+        now = time.monotonic()
+        while self._expiry and self._expiry[0][0] <= now:
+            _, hold_id = heapq.heappop(self._expiry)
+            hold = self._holds.pop(hold_id, None)
+            if hold is not None:
+                self._give_back(*hold[:3])
+                self.stats["expired"] += 1
+                logger.info(f"Table hold {hold_id} expired")
+
+
+inventory = SlotInventory(SLOT_TABLES)
+
+CallbackMetric("voice_table_holds_total", "Table holds by outcome",
+               lambda: {(k,): v for k, v in inventory.stats.items()}, ("result",), "counter")
@@ -0,0 +1,160 @@
+"""
+Runs the websocket server as one or more worker processes sharing a port
+
+Each worker binds its own listening socket with SO_REUSEPORT so the kernel
+spreads new calls across processes (and cores). Workers share nothing;
+call state lives in the worker that accepted the websocket. On SIGTERM a
+worker drains: /ping reports not-ready, new calls are turned away, and the
+process exits once active calls finish or DRAIN_TIMEOUT passes.
+
+RUNTIME_PROFILE selects the event loop, HTTP parser and websocket settings:
+"default" keeps uvicorn's own choices, "asyncio" forces the pure-Python
+stack, and "performance" uses uvloop and httptools when installed (falling
+back otherwise) with websocket settings tuned for small audio frames.
+"""
+import importlib.util
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+
+import uvicorn
+
+from admission import admission_controller, DRAIN_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+WORKERS = int(os.getenv("WORKERS", "1"))
+RESTART_DELAY = 1.0
+
+RUNTIME_PROFILE = os.getenv("RUNTIME_PROFILE", "default")
+# Vonage sends 640-byte audio frames and small JSON control messages
+WS_MAX_SIZE = int(os.getenv("WS_MAX_SIZE", "65536"))
+WS_PING_INTERVAL = float(os.getenv("WS_PING_INTERVAL", "30"))
+WS_PING_TIMEOUT = float(os.getenv("WS_PING_TIMEOUT", "30"))
+
+
+def _installed(module):
+    return importlib.util.find_spec(module) is not None
+
+
+def runtime_options(profile=RUNTIME_PROFILE):
+    """uvicorn.Config keyword arguments for a runtime profile"""
+    if profile == "default":
+        return {}
+    if profile == "asyncio":
+        return {"loop": "asyncio", "http": "h11"}
+    if profile != "performance":
+        raise ValueError(f"Unknown runtime profile: {profile}")
+
+    options = {
+        "loop": "uvloop" if _installed("uvloop") else "asyncio",
+        "http": "httptools" if _installed("httptools") else "h11",
+        "ws_max_size": WS_MAX_SIZE,
+        "ws_ping_interval": WS_PING_INTERVAL,
+        "ws_ping_timeout": WS_PING_TIMEOUT,
+        # Compressing PCM audio costs CPU on every frame for almost no size gain
+        "ws_per_message_deflate": False
+    }
+    if options["loop"] != "uvloop" or options["http"] != "httptools":
+        logger.warning(f"uvloop/httptools not installed, performance profile using "
+                       f"loop={options['loop']} http={options['http']}")
+    return options
+
+
+def _bind_socket(host, port, reuse_port):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.set_inheritable(True)
+    return sock
+
+
+class _DrainingServer(uvicorn.Server):
+    """Drains active calls on the first SIGTERM/SIGINT; a second signal exits immediately"""
+
+    def handle_exit(self, sig, frame):
+        if DRAIN_TIMEOUT <= 0 or admission_controller.draining:
+            return super().handle_exit(sig, frame)
+        admission_controller.begin_drain(DRAIN_TIMEOUT)
+
+    async def on_tick(self, counter):
+        if not self.should_exit and admission_controller.drain_complete():
+            stats = admission_controller.drain_stats
+            logger.info(f"Drain complete: {stats['drained']} call(s) finished, {stats['cut']} cut")
+            self.should_exit = True
+        return await super().on_tick(counter)
+
+
+def spawn_worker(ctx, target, args, worker_index, workers):
+    """Start a worker process that sees its identity from its first import"""
+    # A spawned child re-imports the main module (and so restaurant_data)
+    # before target runs, so WORKER_INDEX/WORKER_COUNT have to be in the
+    # environment it inherits rather than set inside the child.
+    saved = {name: os.environ.get(name) for name in ("WORKER_INDEX", "WORKER_COUNT")}
+    os.environ["WORKER_INDEX"] = str(worker_index)
+    os.environ["WORKER_COUNT"] = str(workers)
+    try:
+        process = ctx.Process(target=target, args=args, daemon=False)
+        process.start()
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+    return process
+
+
+def _serve(app, host, port, worker_index, workers, profile=RUNTIME_PROFILE):
+    sock = _bind_socket(host, port, reuse_port=workers > 1)
+    config = uvicorn.Config(app, host=host, port=port, **runtime_options(profile))
+    _DrainingServer(config).run(sockets=[sock])
+
+
+def run(app, host="0.0.0.0", port=8080, workers=WORKERS, profile=RUNTIME_PROFILE):
+    """Serve app ("module:attribute") with the given number of worker processes"""
+    runtime_options(profile)  # Fail fast on an unknown profile
+    if workers <= 1:
+        _serve(app, host, port, 0, 1, profile)
+        return
+
+    if not hasattr(socket, "SO_REUSEPORT"):
+        raise RuntimeError("Multi-worker mode requires SO_REUSEPORT support")
+
+    ctx = multiprocessing.get_context("spawn")
+    processes = {}
+    stopping = False
+
+    def start_worker(index):
+        process = spawn_worker(ctx, _serve, (app, host, port, index, workers, profile), index, workers)
+        processes[index] = process
+        logger.info(f"Started worker {index} (pid {process.pid})")
+
+    def handle_exit(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for process in processes.values():
+            if process.is_alive():
+                os.kill(process.pid, signum)
+
+    signal.signal(signal.SIGTERM, handle_exit)
+    signal.signal(signal.SIGINT, handle_exit)
+
+    for index in range(workers):
+        start_worker(index)
+
+    while processes:
+        for index, process in list(processes.items()):
+            process.join(timeout=0.5)
+            if process.is_alive():
+                continue
+            del processes[index]
+            if not stopping:
+                logger.warning(f"Worker {index} exited with code {process.exitcode}, restarting")
+                time.sleep(RESTART_DELAY)
+                start_worker(index)
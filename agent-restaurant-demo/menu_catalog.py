@@ -0,0 +1,70 @@
+"""
+Menu lookups built once from restaurant_data.MENU
+
+Items are indexed by id and by normalized name plus spoken aliases, so
+add_item_to_order can take "garlic naans" as readily as "bread2". Only
+exact matches resolve; a near miss gets suggestions for the caller to
+confirm. Each get_menu response is serialized to JSON once at startup.
+"""
+import difflib
+import json
+import re
+from restaurant_data import MENU
+
+# Extra spoken names for items, by id
+ALIASES = {
+    "app1": ["samosas"],
+    "app3": ["chicken sixty five"],
+    "main3": ["biriyani", "chicken biryani", "veg biryani", "vegetable biryani"],
+    "main4": ["dal", "daal makhani"],
+    "drk1": ["sweet lassi", "salted lassi"],
+    "drk2": ["chai", "masala tea"],
+    "drk3": ["lime soda", "nimbu soda"],
+}
+
+_NON_WORD = re.compile(r"[^a-z0-9 ]")
+
+def normalize(name):
+    """Lower case, no punctuation, single spaces and no plural 's' on words"""
+    words = _NON_WORD.sub(' ', name.lower()).split()
+    return ' '.join(w[:-1] if len(w) > 3 and w.endswith('s') and not w.endswith('ss') else w for w in words)
+
+class MenuCatalog:
+    """Id and fuzzy name indexes over the menu, with pre-serialized get_menu responses"""
+
+    def __init__(self, menu, aliases=ALIASES):
+        self.menu = menu
+        self.by_id = {}
+        self.by_name = {}
+        for category, items in menu.items():
+            for item in items:
+                self.by_id[item["id"]] = item
+                self.by_name[normalize(item["name"])] = item
+        for item_id, names in aliases.items():
+            for name in names:
+                self.by_name.setdefault(normalize(name), self.by_id[item_id])
+        self._names = list(self.by_name)
+        self.full_json = json.dumps({"menu": menu, "categories": list(menu)})
+        self.category_json = {category: json.dumps({"category": category, "items": items})
+                              for category, items in menu.items()}
+
+    def find(self, ref):
+        """Menu item whose id, name or alias matches ref exactly (after normalizing), else None"""
+        if not ref:
+            return None
+        item = self.by_id.get(ref) or self.by_id.get(ref.strip().lower())
+        if item:
+            return item
+        return self.by_name.get(normalize(ref))
+
+    def suggestions(self, ref, n=3):
+        """Closest item names, for the caller to confirm when find has no exact match"""
+        matches = difflib.get_close_matches(normalize(ref or ''), self._names, n=n * 2, cutoff=0.4)
+        names = []
+        for match in matches:
+            name = self.by_name[match]["name"]
+            if name not in names:
+                names.append(name)
+        return names[:n]
+
+catalog = MenuCatalog(MENU)
@@ -0,0 +1,116 @@
+"""
+Prometheus text-format metrics for the voice pipeline
+
+Hot paths only bump pre-allocated counters and bucket arrays; cumulative
+bucket counts and label formatting happen at scrape time.
+"""
+from bisect import bisect_left
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers sub-millisecond audio work up to multi-second tool calls
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_metrics = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    pairs = list(zip(labelnames, labelvalues))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        _metrics.append(self)
+
+    def inc(self, *labelvalues, amount=1):
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def collect(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        for labelvalues, value in list(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labelvalues)} {value}"
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series = {}
+        _metrics.append(self)
+
+    def observe(self, value, *labelvalues):
+        series = self._series.get(labelvalues)
+        if series is None:
+            # [per-bucket counts (+Inf last), sum]
+            series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def collect(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for labelvalues, (counts, total) in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labelvalues, ('le', le))} {cumulative}"
+            labels = _format_labels(self.labelnames, labelvalues)
+            yield f"{self.name}_sum{labels} {total}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class CallbackMetric:
+    """Gauge or counter whose samples are read from live objects at scrape time"""
+
+    def __init__(self, name, documentation, callback, labelnames=(), metric_type="gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self.labelnames = labelnames
+        self.metric_type = metric_type
+        _metrics.append(self)
+
+    def collect(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.metric_type}"
+        samples = self.callback()
+        if not isinstance(samples, dict):
+            samples = {(): samples}
+        for labelvalues, value in samples.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labelvalues)} {value}"
+
+
+def render():
+    """Render every registered metric in Prometheus text exposition format"""
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.collect())
+    return "\n".join(lines) + "\n"
+
+
+# Pipeline metrics shared by the bridge, tools and server
+resample_seconds = Histogram("voice_resample_seconds", "Time to resample one model audio chunk")
+encode_seconds = Histogram("voice_audio_encode_seconds", "Time to encode one caller audio frame into a Bedrock event")
+bedrock_events = Counter("voice_bedrock_events_total", "Bedrock stream events by direction and type", ("direction", "type"))
+tool_latency_seconds = Histogram("voice_tool_latency_seconds", "Tool execution latency", ("tool",))
+tool_calls_collapsed = Counter("voice_tool_calls_collapsed_total", "Tool calls served by an identical call already in flight", ("tool",))
+tool_round_trips = Histogram("voice_tool_round_trips", "Upstream API round trips per tool call", ("tool",), buckets=(0, 1, 2, 3, 4, 5, 8))
+barge_in_seconds = Histogram("voice_barge_in_seconds", "Time from interruption to the Vonage clear sent and queued audio dropped")
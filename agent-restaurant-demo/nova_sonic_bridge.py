@@ -1,19 +1,24 @@
 import asyncio
 import base64
+import functools
 import json
 import uuid
 import numpy as np
 import time
 import os
+import weakref
 import yaml
-import boto3
 from scipy import signal
-from aws_sdk_bedrock_runtime.client import BedrockRuntimeClient, InvokeModelWithBidirectionalStreamOperationInput
+from aws_sdk_bedrock_runtime.client import InvokeModelWithBidirectionalStreamOperationInput
 from aws_sdk_bedrock_runtime.models import InvokeModelWithBidirectionalStreamInputChunk, BidirectionalInputPayloadPart
-from aws_sdk_bedrock_runtime.config import Config, HTTPAuthSchemeResolver, SigV4AuthScheme
-from smithy_aws_core.identity.environment import EnvironmentCredentialsResolver
 from tools import get_all_tool_definitions, execute_tool
+from tools.tool_cache import ToolCache, ToolMemo
+from tools.registry import is_idempotent, domain_of
+from tools.intents import intent_matcher
+from tool_supervisor import ToolSupervisor
 from config import TIMEZONE_OFFSET
+from aws_clients import aws_clients
+from metrics import CallbackMetric, resample_seconds, encode_seconds, bedrock_events, barge_in_seconds
 from otel_instrumentation import log_model_input, log_model_output, log_model_choice
 from opentelemetry import trace
 from bedrock_agentcore.memory.session import MemorySessionManager
@@ -22,6 +27,14 @@ from bedrock_agentcore.memory.constants import ConversationalMessage, MessageRol
 # Get tracer with proper scope name for AgentCore evaluations
 tracer = trace.get_tracer("strands.telemetry.tracer", "1.0.0")
 
+# Live bridges, for per-call queue depth metrics
+_live_bridges = weakref.WeakSet()
+
+def _event_type(event_json):
+    """Event name from a serialized event without parsing the (possibly large) payload"""
+    start = event_json.find('"', event_json.find('{', 1)) + 1
+    return event_json[start:event_json.find('"', start)]
+
 class NovaSonicBridge:
     def __init__(self, model_id='amazon.nova-2-sonic-v1:0', region='us-east-1'):
         self.model_id = model_id
@@ -37,6 +50,10 @@ class NovaSonicBridge:
         self.scheduler_paused = asyncio.Event()
         self.scheduler_paused.set()
         self.websocket = None
+        self.tool_memo = ToolMemo()
+        self.tool_supervisor = ToolSupervisor(functools.partial(execute_tool, memo=self.tool_memo))
+        self.tool_cache = ToolCache(self.tool_supervisor.run)
+        _live_bridges.add(self)
         self.session_span = None  # Track session span for logging
         self.actor_id = None
         self.memory_session = None
@@ -48,38 +65,37 @@ class NovaSonicBridge:
             clear_command = json.dumps({"action": "clear"})
             await self.websocket.send_text(clear_command)
 
+    def _drain_audio_queue(self):
+        """Discard audio queued for the caller"""
+        while not self.audio_queue.empty():
+            try:
+                self.audio_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+
     def _resample_audio(self, audio_bytes, from_rate=24000, to_rate=16000):
+        started = time.perf_counter()
         audio_data = np.frombuffer(audio_bytes, dtype=np.int16)
         num_samples = int(len(audio_data) * to_rate / from_rate)
         resampled = signal.resample(audio_data, num_samples)
-        return resampled.astype(np.int16).tobytes()
+        result = resampled.astype(np.int16).tobytes()
+        resample_seconds.observe(time.perf_counter() - started)
+        return result
         
     def _initialize_client(self):
-        session = boto3.Session(region_name=self.region)
-        credentials = session.get_credentials()
-        if credentials:
-            os.environ['AWS_ACCESS_KEY_ID'] = credentials.access_key
-            os.environ['AWS_SECRET_ACCESS_KEY'] = credentials.secret_key
-            if credentials.token:
-                os.environ['AWS_SESSION_TOKEN'] = credentials.token
-        
-        config = Config(
-            endpoint_uri=f"https://bedrock-runtime.{self.region}.amazonaws.com",
-            region=self.region,
-            aws_credentials_identity_resolver=EnvironmentCredentialsResolver(),
-            auth_scheme_resolver=HTTPAuthSchemeResolver(),
-            auth_schemes={"aws.auth#sigv4": SigV4AuthScheme(service="bedrock")}
-        )
-        self.client = BedrockRuntimeClient(config=config)
+        self.client = aws_clients.bedrock_runtime(self.region)
     
     async def send_event(self, event_json):
         event = InvokeModelWithBidirectionalStreamInputChunk(
             value=BidirectionalInputPayloadPart(bytes_=event_json.encode('utf-8'))
         )
         await self.stream.input_stream.send(event)
+        bedrock_events.inc("out", _event_type(event_json))
     
     async def start_session(self, actor_id: str = "61421783196"):
         self.actor_id = actor_id
+        # Reads configured in PREFETCH_TOOLS run while the session is set up
+        self.tool_cache.prefetch_session_start()
         print(f"[MEMORY] Starting session for actor: {self.actor_id}")
         
         # Load memory config
@@ -92,7 +108,8 @@ class NovaSonicBridge:
             # Initialize memory session
             self.memory_session_manager = MemorySessionManager(
                 memory_id=memory_id,
-                region_name=self.region
+                region_name=self.region,
+                boto3_session=aws_clients.session(self.region)
             )
             
             self.memory_session = self.memory_session_manager.create_memory_session(
@@ -311,8 +328,10 @@ Remember: You're helping customers have a great experience ordering from Spice G
         
         # Don't log audio chunks - too noisy
         
+        started = time.perf_counter()
         blob = base64.b64encode(audio_bytes).decode('utf-8')
         audio_event = f'{{"event":{{"audioInput":{{"promptName":"{self.prompt_name}","contentName":"{self.audio_content_name}","content":"{blob}"}}}}}}'
+        encode_seconds.observe(time.perf_counter() - started)
         await self.send_event(audio_event)
     
     async def end_audio_input(self):
@@ -324,9 +343,9 @@ Remember: You're helping customers have a great experience ordering from Spice G
         return await self.audio_queue.get()
 
 
-    async def _handle_tool_use(self, tool_name, tool_use, tool_use_id):
-        # Execute tool asynchronously without blocking conversation
-        asyncio.create_task(self._execute_tool_async(tool_name, tool_use, tool_use_id))
+    def _handle_tool_use(self, tool_name, tool_use, tool_use_id):
+        # Execute tool asynchronously without blocking conversation; the task is owned by this call
+        self.tool_supervisor.spawn(self._execute_tool_async(tool_name, tool_use, tool_use_id))
     
     async def send_text(self, text):
         """Send text to Nova Sonic during conversation"""
@@ -375,7 +394,11 @@ Remember: You're helping customers have a great experience ordering from Spice G
         try:
             
             content = json.loads(tool_use.get('content', '{}'))
-            result = await execute_tool(tool_name, content)
+            result = await self.tool_cache.get(tool_name, content)
+            if result is None:
+                if not is_idempotent(tool_name):
+                    self.tool_cache.invalidate(domain_of(tool_name))
+                result = await self.tool_supervisor.run(tool_name, content)
             await self._send_tool_result(content_name, tool_use_id, result)
         except Exception as e:
             await self._send_tool_result(content_name, tool_use_id, {"error": str(e)})
@@ -404,7 +427,8 @@ Remember: You're helping customers have a great experience ordering from Spice G
                 "toolResult": {
                     "promptName": self.prompt_name,
                     "contentName": content_name,
-                    "content": json.dumps(result)
+                    # Tools may return pre-serialized JSON (e.g. get_menu)
+                    "content": result if isinstance(result, str) else json.dumps(result)
                 }
             }
         }
@@ -421,6 +445,8 @@ Remember: You're helping customers have a great experience ordering from Spice G
         await self.send_event(json.dumps(tool_end))
     
     async def end_session(self):
+        self.tool_cache.close()
+        self.tool_supervisor.cancel_all()
         if not self.is_active:
             return
         self.is_active = False
@@ -430,9 +456,6 @@ Remember: You're helping customers have a great experience ordering from Spice G
             await self.send_event('{"event":{"sessionEnd":{}}}')
             await self.stream.input_stream.close()
         
-        # End OTEL span
-        if self.session_span:
-            self.session_span.end()
         if self.response and not self.response.done():
             try:
                 await asyncio.wait_for(self.response, timeout=2.0)
@@ -450,6 +473,8 @@ Remember: You're helping customers have a great experience ordering from Spice G
                 if result.value and result.value.bytes_:
                     response_data = result.value.bytes_.decode('utf-8')
                     json_data = json.loads(response_data)
+                    if 'event' in json_data:
+                        bedrock_events.inc("in", next(iter(json_data['event']), "unknown"))
                     
                     if 'event' in json_data and 'audioOutput' in json_data['event']:
                         audio_content = json_data['event']['audioOutput']['content']
@@ -468,6 +493,10 @@ Remember: You're helping customers have a great experience ordering from Spice G
                         content = text_output.get('content', '')
                         role = text_output.get('role', 'UNKNOWN')
                         
+                        # Warm the reads the caller's words suggest before the model asks for them
+                        if role == 'USER':
+                            self.tool_cache.speculate(intent_matcher.match(content))
+                        
                         # Log USER and ASSISTANT messages as separate events
                         if self.session_span and content:
                             if role == 'USER':
@@ -507,15 +536,14 @@ Remember: You're helping customers have a great experience ordering from Spice G
                         try:
                             content_json = json.loads(content)
                             if content_json.get('interrupted'):
+                                barge_in_started = time.perf_counter()
                                 # Clear Vonage's audio buffer
                                 await self.clear_vonage_buffer()
+                                self._drain_audio_queue()
+                                barge_in_seconds.observe(time.perf_counter() - barge_in_started)
+                                # Drop audio that was still in flight, outside the measured span
                                 await asyncio.sleep(0.1)
-                                
-                                while not self.audio_queue.empty():
-                                    try:
-                                        self.audio_queue.get_nowait()
-                                    except asyncio.QueueEmpty:
-                                        break
+                                self._drain_audio_queue()
                         except json.JSONDecodeError:
                             pass
                     
@@ -526,8 +554,10 @@ Remember: You're helping customers have a great experience ordering from Spice G
                         if self.session_span:
                             log_model_choice(self.session_span, tool_use)
                         
-                        asyncio.create_task(self._handle_tool_use(
-                            tool_use['toolName'], tool_use, tool_use['toolUseId']
-                        ))
+                        self._handle_tool_use(tool_use['toolName'], tool_use, tool_use['toolUseId'])
         except Exception as e:
             print(e)
+
+CallbackMetric("voice_call_audio_queue_depth", "Audio frames queued for the caller, per call",
+               lambda: {(bridge.prompt_name[:8],): bridge.audio_queue.qsize() for bridge in list(_live_bridges) if bridge.is_active},
+               labelnames=("call",))
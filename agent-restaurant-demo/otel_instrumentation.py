@@ -43,7 +43,7 @@ def instrument_tool(tool_name):
                     # Add result as event
                     span.add_event("tool_execution_completed", {
                         "tool.name": tool_name,
-                        "tool.output": json.dumps(result)[:500],
+                        "tool.output": (result if isinstance(result, str) else json.dumps(result))[:500],
                         "success": True
                     })
                     
@@ -62,8 +62,31 @@ AVAILABILITY = {
     }
 }
 
+# Capacities of the tables a slot opens, in the order they are released:
+# a slot with N available tables offers the first N (repeating past the end)
+FLOOR_PLAN = [4, 2, 4, 6, 2, 8]
+
+def tables_by_capacity(count):
+    """{capacity: tables} for a slot with count available tables"""
+    tables = {}
+    for i in range(count):
+        capacity = FLOOR_PLAN[i % len(FLOOR_PLAN)]
+        tables[capacity] = tables.get(capacity, 0) + 1
+    return tables
+
+# Tables per slot, by capacity: {date: {time: {capacity: tables}}}.
+# Reservations, orders and this inventory live in process memory, so the
+# restaurant demo always runs as a single worker (see server.py).
+SLOT_TABLES = {
+    date: {slot_time: tables_by_capacity(tables) for slot_time, tables in slots.items()}
+    for date, slots in AVAILABILITY.items()
+}
+
 # In-memory storage for orders and reservations
 ORDERS = {}
 RESERVATIONS = []
 
+def next_reservation_id():
+    return f"RES{len(RESERVATIONS) + 1:04d}"
+
 TAX_RATE = 0.18  # 18% GST
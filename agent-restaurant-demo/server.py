@@ -2,14 +2,17 @@ import asyncio
 import json
 import logging
 import os
-import requests
-from requests.exceptions import RequestException
 from datetime import datetime, timezone
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from nova_sonic_bridge import NovaSonicBridge
-from aws_secrets import setup_credentials
-import boto3
+from aws_secrets import secrets_cache
+from credentials import credential_provider
+from aws_clients import aws_clients
+from session_reaper import session_reaper
+from admission import admission_controller, load_busy_announcement, play_busy_announcement
+import metrics
+from watchdog import loop_watchdog
 import uuid
 from opentelemetry import baggage, context, trace
 
@@ -25,8 +28,6 @@ logging.getLogger('boto3').setLevel(logging.CRITICAL)
 # Get OTEL tracer with proper scope name for AgentCore evaluations
 tracer = trace.get_tracer("strands.telemetry.tracer", "1.0.0")
 
-credential_refresh_task = None
-
 def create_log_stream():
     """Create CloudWatch log stream if it doesn't exist
     log_group = os.getenv("OTEL_LOG_GROUP")
@@ -36,7 +37,7 @@ def create_log_stream():
     log_stream = "runtime-logs"
     
     try:
-        logs_client = boto3.client('logs', region_name=os.getenv("AWS_DEFAULT_REGION", "us-east-1"))
+        logs_client = aws_clients.client('logs')
         logs_client.create_log_stream(logGroupName=log_group, logStreamName=log_stream)
         return log_stream
     except logs_client.exceptions.ResourceAlreadyExistsException:
@@ -49,123 +50,51 @@ def create_log_stream():
     return "runtime-logs"
 
     
-def get_imdsv2_token():
-    try:
-        response = requests.put(
-            "http://169.254.169.254/latest/api/token",
-            headers={"X-aws-ec2-metadata-token-ttl-seconds": "21600"},
-            timeout=2
-        )
-        if response.status_code == 200:
-            return response.text
-    except Exception:
-        pass
-    return None
-
-def get_credentials_from_imds():
-    result = {"success": False, "credentials": None, "role_name": None, "error": None}
-    try:
-        token = get_imdsv2_token()
-        headers = {"X-aws-ec2-metadata-token": token} if token else {}
-        
-        role_response = requests.get(
-            "http://169.254.169.254/latest/meta-data/iam/security-credentials/",
-            headers=headers, timeout=2
-        )
-        if role_response.status_code != 200:
-            result["error"] = f"Failed to retrieve IAM role name: HTTP {role_response.status_code}"
-            return result
-        
-        role_name = role_response.text.strip()
-        result["role_name"] = role_name
-        
-        creds_response = requests.get(
-            f"http://169.254.169.254/latest/meta-data/iam/security-credentials/{role_name}",
-            headers=headers, timeout=2
-        )
-        if creds_response.status_code != 200:
-            result["error"] = f"Failed to retrieve credentials: HTTP {creds_response.status_code}"
-            return result
-        
-        credentials = creds_response.json()
-        result["success"] = True
-        result["credentials"] = {
-            "AccessKeyId": credentials.get("AccessKeyId"),
-            "SecretAccessKey": credentials.get("SecretAccessKey"),
-            "Token": credentials.get("Token"),
-            "Expiration": credentials.get("Expiration")
-        }
-    except RequestException as e:
-        result["error"] = f"Request exception: {str(e)}"
-    except Exception as e:
-        result["error"] = f"Unexpected error: {str(e)}"
-    return result
-
-async def refresh_credentials_from_imds():
-    while True:
-        try:
-            imds_result = get_credentials_from_imds()
-            if imds_result["success"]:
-                creds = imds_result["credentials"]
-                os.environ["AWS_ACCESS_KEY_ID"] = creds["AccessKeyId"]
-                os.environ["AWS_SECRET_ACCESS_KEY"] = creds["SecretAccessKey"]
-                os.environ["AWS_SESSION_TOKEN"] = creds["Token"]
-                
-                try:
-                    expiration = datetime.fromisoformat(creds['Expiration'].replace('Z', '+00:00'))
-                    now = datetime.now(expiration.tzinfo)
-                    refresh_interval = min(max((expiration - now).total_seconds() - 300, 60), 3600)
-                except Exception:
-                    refresh_interval = 3600
-                await asyncio.sleep(refresh_interval)
-            else:
-                logger.error(f"Failed to refresh credentials: {imds_result['error']}")
-                await asyncio.sleep(300)
-        except asyncio.CancelledError:
-            break
-        except Exception as e:
-            logger.error(f"Error in credential refresh: {e}")
-            await asyncio.sleep(300)
-
 app = FastAPI(title="Vonage Nova Sonic WebSocket Server")
 
 @app.on_event("startup")
 async def startup_event():
-    global credential_refresh_task
+    await loop_watchdog.start()
+    # Credentials are held in memory and refreshed ahead of expiry off the loop
+    await credential_provider.start()
+    await aws_clients.start()
     
-    # Setup secrets and credentials
-    setup_credentials()
+    # Log stream is shared by all calls, so create it once rather than per connection
+    await asyncio.to_thread(create_log_stream)
     
-    if os.getenv("AWS_ACCESS_KEY_ID") and os.getenv("AWS_SECRET_ACCESS_KEY"):
-        pass  # Using credentials from environment
-    else:
-        imds_result = get_credentials_from_imds()
-        if imds_result["success"]:
-            creds = imds_result["credentials"]
-            os.environ["AWS_ACCESS_KEY_ID"] = creds["AccessKeyId"]
-            os.environ["AWS_SECRET_ACCESS_KEY"] = creds["SecretAccessKey"]
-            os.environ["AWS_SESSION_TOKEN"] = creds["Token"]
-            credential_refresh_task = asyncio.create_task(refresh_credentials_from_imds())
-        else:
-            logger.error(f"❌ Failed to fetch credentials: {imds_result['error']}")
+    # Secrets are cached in memory and re-fetched only when they rotate
+    await secrets_cache.start()
+    
+    load_busy_announcement()
+    await admission_controller.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    global credential_refresh_task
-    if credential_refresh_task and not credential_refresh_task.done():
-        credential_refresh_task.cancel()
-        try:
-            await credential_refresh_task
-        except asyncio.CancelledError:
-            pass
+    await credential_provider.stop()
+    await secrets_cache.stop()
+    await admission_controller.stop()
+    await loop_watchdog.stop()
+    await session_reaper.close()
 
 @app.get("/ping")
 @app.get("/")
 async def health_check():
+    if admission_controller.draining:
+        # Not ready: load balancers should stop sending calls to this node
+        return JSONResponse({"status": "draining"}, status_code=503)
     return JSONResponse({"status": "healthy"})
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket, caller: str = "61421783196"):
+    if not admission_controller.try_admit():
+        # Over budget: tell the caller all lines are busy instead of starting a model session
+        await play_busy_announcement(websocket)
+        return
+    
     # Generate unique session ID for this call
     session_id = f"session-{uuid.uuid4()}"
     
@@ -173,10 +102,6 @@ async def websocket_endpoint(websocket: WebSocket, caller: str = "61421783196"):
     ctx = baggage.set_baggage("session.id", session_id)
     token = context.attach(ctx)
     
-    # Create log stream for this session
-    log_stream = create_log_stream()
-    
-    
     # Create root span for entire session (agent invocation)
     with tracer.start_as_current_span(
         "invoke_agent restaurant_order_agent",
@@ -240,14 +165,10 @@ async def websocket_endpoint(websocket: WebSocket, caller: str = "61421783196"):
                 session_span.set_status(trace.Status(trace.StatusCode.ERROR, str(e)))
                 session_span.record_exception(e)
             finally:
-                await nova_bridge.end_audio_input()
-                await nova_bridge.end_session()
-                if response_task:
-                    response_task.cancel()
-                    try:
-                        await response_task
-                    except asyncio.CancelledError:
-                        pass
+                # Teardown runs in the background so the handler returns immediately
+                session_reaper.reap(nova_bridge, response_task)
+                # The span ends with this handler's `with` block; teardown must not touch it
+                nova_bridge.session_span = None
                 
                 # Add session end event and timestamp
                 session_span.set_attribute("gen_ai.event.end_time", datetime.now(timezone.utc).isoformat())
@@ -256,6 +177,7 @@ async def websocket_endpoint(websocket: WebSocket, caller: str = "61421783196"):
         finally:
             # Detach context
             context.detach(token)
+            admission_controller.release()
 
 async def handle_audio_responses(websocket: WebSocket, nova_bridge: NovaSonicBridge):
     try:
@@ -267,5 +189,10 @@ async def handle_audio_responses(websocket: WebSocket, nova_bridge: NovaSonicBri
         logger.error(f"Audio response error: {e}")
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8080)
+    import launcher
+    # Reservations, orders and the table inventory are held in process memory.
+    # A second worker would answer from a different inventory, so callers
+    # could be told "no tables" while another worker has one free.
+    if launcher.WORKERS > 1:
+        logger.warning(f"WORKERS={launcher.WORKERS} ignored: the restaurant demo keeps bookings in memory and runs one worker")
+    launcher.run("server:app", host="0.0.0.0", port=8080, workers=1)
@@ -9,8 +9,7 @@ import os
 import base64
 from datetime import datetime
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import JSONResponse
-import boto3
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from strands.experimental.bidi.agent import BidiAgent
 from strands.experimental.bidi.models.nova_sonic import BidiNovaSonicModel
@@ -30,15 +29,17 @@ from strands_tools import (
     reject_order
 )
 from config import TIMEZONE_OFFSET
-from aws_secrets import setup_credentials
+from aws_secrets import secrets_cache
+from aws_clients import aws_clients
+from admission import admission_controller, load_busy_announcement, play_busy_announcement
+import metrics
+from watchdog import loop_watchdog
 
 # Configure logging
 LOGLEVEL = os.environ.get("LOGLEVEL", "INFO").upper()
 logging.basicConfig(level=LOGLEVEL, format="%(asctime)s %(message)s")
 logger = logging.getLogger(__name__)
 
-credential_refresh_task = None
-
 def create_log_stream():
     """Create CloudWatch log stream if it doesn't exist"""
     log_group = os.getenv("OTEL_LOG_GROUP")
@@ -49,7 +50,7 @@ def create_log_stream():
     log_stream = "runtime-logs"
     
     try:
-        logs_client = boto3.client('logs', region_name=os.getenv("AWS_DEFAULT_REGION", "us-east-1"))
+        logs_client = aws_clients.client('logs')
         logs_client.create_log_stream(logGroupName=log_group, logStreamName=log_stream)
         logger.info(f"Created log stream: {log_stream}")
         return log_stream
@@ -64,35 +65,45 @@ app = FastAPI(title="Restaurant Order Agent")
 
 @app.on_event("startup")
 async def startup_event():
-    global credential_refresh_task
-    setup_credentials()
-    credential_refresh_task = asyncio.create_task(refresh_credentials_periodically())
-
-async def refresh_credentials_periodically():
-    while True:
-        await asyncio.sleep(3600)
-        setup_credentials()
+    await loop_watchdog.start()
+    await aws_clients.start()
+    # Log stream is shared by all calls, so create it once rather than per connection
+    await asyncio.to_thread(create_log_stream)
+    # Secrets are cached in memory and re-fetched only when they rotate
+    await secrets_cache.start()
+    load_busy_announcement()
+    await admission_controller.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    global credential_refresh_task
-    if credential_refresh_task and not credential_refresh_task.done():
-        credential_refresh_task.cancel()
-        try:
-            await credential_refresh_task
-        except asyncio.CancelledError:
-            pass
+    await secrets_cache.stop()
+    await admission_controller.stop()
+    await loop_watchdog.stop()
 
 @app.get("/ping")
 @app.get("/")
 async def health_check():
+    if admission_controller.draining:
+        # Not ready: load balancers should stop sending calls to this node
+        return JSONResponse({"status": "draining"}, status_code=503)
     return JSONResponse({"status": "healthy"})
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    # Create log stream for this session
-    create_log_stream()
-    
+    if not admission_controller.try_admit():
+        # Over budget: tell the caller all lines are busy instead of starting a model session
+        await play_busy_announcement(websocket)
+        return
+    try:
+        await run_agent_call(websocket)
+    finally:
+        admission_controller.release()
+
+async def run_agent_call(websocket: WebSocket):
     logger.info(f"WebSocket connection from: {websocket.client}")
     await websocket.accept()
     
@@ -227,7 +238,7 @@ Remember: You're helping customers have a great experience ordering from Bella I
         logger.info("Connection closed")
 
 if __name__ == "__main__":
-    import uvicorn
+    import launcher
     port = int(os.getenv("PORT", "8080"))
     host = "0.0.0.0" 
-    uvicorn.run(app, host=host, port=port)
+    launcher.run("server_strands:app", host=host, port=port)
@@ -4,7 +4,9 @@ Strands-compatible tools for restaurant agent
 from datetime import datetime
 from strands.tools.decorator import tool
 from config import TIMEZONE_OFFSET
-from restaurant_data import MENU, AVAILABILITY, RESERVATIONS, ORDERS, TAX_RATE
+from restaurant_data import MENU, RESERVATIONS, ORDERS, TAX_RATE, next_reservation_id
+from inventory import inventory
+from menu_catalog import catalog
 import uuid
 
 @tool
@@ -41,19 +43,28 @@ async def check_availability(date: str, time: str, party_size: int = 2) -> dict:
     if not date or not time:
         return {"error": "Date and time are required"}
     
-    if date not in AVAILABILITY:
+    if party_size < 1:
+        return {"error": "Party size must be at least 1"}
+    
+    if not inventory.has_date(date):
         return {
             "available": False,
             "message": f"No availability data for {date}. Please choose another date."
         }
     
-    if time not in AVAILABILITY[date]:
+    if not inventory.has_slot(date, time):
         return {
             "available": False,
-            "message": f"Time slot {time} not available. Available times: {', '.join(AVAILABILITY[date].keys())}"
+            "message": f"Time slot {time} not available. Nearest times: {', '.join(inventory.nearest_slots(date, time))}"
         }
     
-    available_tables = AVAILABILITY[date][time]
+    if party_size > inventory.largest_table():
+        return {
+            "available": False,
+            "message": f"Our largest table seats {inventory.largest_table()}. Please call us to arrange a group of {party_size}."
+        }
+    
+    available_tables = inventory.available(date, time, party_size)
     
     if available_tables > 0:
         return {
@@ -65,12 +76,15 @@ async def check_availability(date: str, time: str, party_size: int = 2) -> dict:
             "message": f"Yes, we have {available_tables} table(s) available for {party_size} people at {time} on {date}"
         }
     else:
-        alternatives = [t for t, tables in AVAILABILITY[date].items() if tables > 0]
+        alternatives = inventory.nearest(date, time, party_size)
         return {
             "available": False,
             "date": date,
             "time": time,
-            "message": f"Sorry, no tables available at {time}. Alternative times: {', '.join(alternatives)}"
+            "party_size": party_size,
+            "alternatives": alternatives,
+            "message": (f"Sorry, no tables for {party_size} at {time}. Nearest times: {', '.join(alternatives)}"
+                        if alternatives else f"Sorry, no tables for {party_size} left on {date}.")
         }
 
 
@@ -80,26 +94,36 @@ async def create_reservation(date: str, time: str, party_size: int, name: str, p
     if not all([date, time, party_size, name]):
         return {"error": "Date, time, party size, and name are required"}
     
-    if date not in AVAILABILITY or time not in AVAILABILITY[date]:
+    if party_size < 1:
+        return {"error": "Party size must be at least 1"}
+    
+    if not inventory.has_slot(date, time):
         return {"error": f"Invalid date or time slot"}
     
-    if AVAILABILITY[date][time] <= 0:
-        return {"error": f"No tables available at {time} on {date}"}
-    
-    reservation_id = f"RES{len(RESERVATIONS) + 1:04d}"
-    reservation = {
-        "reservation_id": reservation_id,
-        "date": date,
-        "time": time,
-        "party_size": party_size,
-        "name": name,
-        "phone": phone,
-        "status": "confirmed",
-        "created_at": datetime.now().isoformat()
-    }
+    hold_id = inventory.hold(date, time, party_size)
+    if hold_id is None:
+        alternatives = inventory.nearest(date, time, party_size)
+        hint = f" Nearest times: {', '.join(alternatives)}" if alternatives else ""
+        return {"error": f"No tables for {party_size} available at {time} on {date}.{hint}"}
     
-    RESERVATIONS.append(reservation)
-    AVAILABILITY[date][time] -= 1
+    try:
+        reservation_id = next_reservation_id()
+        reservation = {
+            "reservation_id": reservation_id,
+            "date": date,
+            "time": time,
+            "party_size": party_size,
+            "table_size": inventory.table_of(hold_id),
+            "name": name,
+            "phone": phone,
+            "status": "confirmed",
+            "created_at": datetime.now().isoformat()
+        }
+        RESERVATIONS.append(reservation)
+    except BaseException:
+        inventory.release(hold_id)
+        raise
+    inventory.commit(hold_id)
     
     return {
         "success": True,
@@ -137,21 +161,16 @@ async def create_order(order_type: str, customer_name: str = None) -> dict:
 
 @tool
 async def add_item_to_order(order_id: str, item_id: str, quantity: int = 1) -> dict:
-    """Add a menu item to an existing order"""
+    """Add a menu item to an existing order. item_id is the menu ID (e.g. main1) or the item name as spoken"""
     if order_id not in ORDERS:
         return {"error": f"Order {order_id} not found"}
     
-    item = None
-    for category in MENU.values():
-        for menu_item in category:
-            if menu_item["id"] == item_id:
-                item = menu_item
-                break
-        if item:
-            break
+    item = catalog.find(item_id)
     
     if not item:
-        return {"error": f"Item {item_id} not found in menu"}
+        suggestions = catalog.suggestions(item_id)
+        hint = f". Ask the customer whether they meant: {', '.join(suggestions)}" if suggestions else ""
+        return {"error": f"Item {item_id} not found in menu{hint}"}
     
     order_item = {
         "item_id": item["id"],
@@ -1,4 +1,10 @@
+import asyncio
+import time
+
+from metrics import tool_latency_seconds, tool_calls_collapsed
 from .datetime_info import get_current_datetime, get_tool_definition as get_datetime_tool
+from .registry import TOOLS, register, is_idempotent, domain_of
+from .tool_cache import cache_key
 from .menu import get_menu, get_tool_definition as get_menu_tool
 from .availability import check_availability, get_tool_definition as get_availability_tool
 from .reservation import create_reservation, get_tool_definition as get_reservation_tool
@@ -21,18 +27,19 @@ calculate_bill = instrument_tool("calculate_bill")(calculate_bill)
 complete_order = instrument_tool("complete_order")(complete_order)
 reject_order = instrument_tool("reject_order")(reject_order)
 
-# Registry of all available tools
-TOOLS = {
-    "get_current_datetime": get_current_datetime,
-    "get_menu": get_menu,
-    "check_availability": check_availability,
-    "create_reservation": create_reservation,
-    "create_order": create_order,
-    "add_item_to_order": add_item_to_order,
-    "calculate_bill": calculate_bill,
-    "complete_order": complete_order,
-    "reject_order": reject_order
-}
+# Registry of all available tools, with what may be reused and what each write invalidates
+register("get_current_datetime", get_current_datetime, idempotent=True, scope="process", ttl=60, domain="clock")
+register("get_menu", get_menu, idempotent=True, scope="process", ttl=300, domain="menu")
+register("check_availability", check_availability, idempotent=True, scope="call", ttl=30, domain="tables")
+register("create_reservation", create_reservation, domain="tables")
+register("create_order", create_order, domain="orders")
+register("add_item_to_order", add_item_to_order, domain="orders")
+register("calculate_bill", calculate_bill, idempotent=True, scope="call", ttl=30, domain="orders")
+register("complete_order", complete_order, domain="orders")
+register("reject_order", reject_order, domain="orders")
+
+# Canonical call -> [shared task, number of callers waiting on it]
+_inflight = {}
 
 def get_all_tool_definitions():
     """Get all tool definitions for Nova Sonic"""
@@ -44,8 +51,53 @@ def get_all_tool_definitions():
         *get_order_tools()
     ]
 
-async def execute_tool(tool_name, tool_input):
-    """Execute a tool by name"""
-    if tool_name in TOOLS:
+async def _run(tool_name, tool_input):
+    started = time.perf_counter()
+    try:
         return await TOOLS[tool_name](tool_input)
-    return {"error": f"Unknown tool: {tool_name}"}
+    finally:
+        tool_latency_seconds.observe(time.perf_counter() - started, tool_name)
+
+async def _single_flight(tool_name, tool_input):
+    """Join an identical call already in flight, or start one that later callers can join"""
+    key = cache_key(tool_name, tool_input)
+    entry = _inflight.get(key)
+    if entry is None:
+        task = asyncio.create_task(_run(tool_name, tool_input))
+        entry = _inflight[key] = [task, 0]
+        task.add_done_callback(lambda _: _forget(key, entry))
+    else:
+        tool_calls_collapsed.inc(tool_name)
+    entry[1] += 1
+    try:
+        return await asyncio.shield(entry[0])
+    finally:
+        entry[1] -= 1
+        # The last caller to give up (e.g. on hangup) cancels the shared execution;
+        # it leaves the map first so a new identical call starts afresh instead of joining it
+        if entry[1] == 0 and not entry[0].done():
+            _forget(key, entry)
+            entry[0].cancel()
+
+def _forget(key, entry):
+    if _inflight.get(key) is entry:
+        del _inflight[key]
+
+async def execute_tool(tool_name, tool_input, memo=None):
+    """Execute a tool by name, reusing memoized results from the call's ToolMemo when given"""
+    if tool_name not in TOOLS:
+        return {"error": f"Unknown tool: {tool_name}"}
+    if not is_idempotent(tool_name):
+        try:
+            return await _run(tool_name, tool_input)
+        finally:
+            if memo is not None:
+                memo.invalidate(domain_of(tool_name))
+    if memo is not None:
+        result = memo.get(tool_name, tool_input)
+        if result is not None:
+            return result
+    result = await _single_flight(tool_name, tool_input)
+    if memo is not None:
+        memo.put(tool_name, tool_input, result)
+    return result
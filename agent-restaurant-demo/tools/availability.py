@@ -1,6 +1,6 @@
 import sys
 sys.path.append('..')
-from restaurant_data import AVAILABILITY
+from inventory import inventory
 import json
 
 async def check_availability(params):
@@ -8,24 +8,34 @@ async def check_availability(params):
     print(f"[TOOL] check_availability called with params: {params}")
     date = params.get("date")
     time = params.get("time")
-    party_size = params.get("party_size", 2)
+    party_size = int(params.get("party_size", 2))
     
     if not date or not time:
         return {"error": "Date and time are required"}
     
-    if date not in AVAILABILITY:
+    if party_size < 1:
+        return {"error": "Party size must be at least 1"}
+    
+    if not inventory.has_date(date):
         return {
             "available": False,
             "message": f"No availability data for {date}. Please choose another date."
         }
     
-    if time not in AVAILABILITY[date]:
+    if not inventory.has_slot(date, time):
+        nearby = inventory.nearest_slots(date, time)
+        return {
+            "available": False,
+            "message": f"Time slot {time} not available. Nearest times: {', '.join(nearby)}"
+        }
+    
+    if party_size > inventory.largest_table():
         return {
             "available": False,
-            "message": f"Time slot {time} not available. Available times: {', '.join(AVAILABILITY[date].keys())}"
+            "message": f"Our largest table seats {inventory.largest_table()}. Please call us to arrange a group of {party_size}."
         }
     
-    available_tables = AVAILABILITY[date][time]
+    available_tables = inventory.available(date, time, party_size)
     
     if available_tables > 0:
         result = {
@@ -39,14 +49,17 @@ async def check_availability(params):
         print(f"[TOOL] check_availability: Available - {available_tables} tables")
         return result
     else:
-        # Suggest alternative times
-        alternatives = [t for t, tables in AVAILABILITY[date].items() if tables > 0]
+        # Suggest the nearest times with a table for this party
+        alternatives = inventory.nearest(date, time, party_size)
         print(f"[TOOL] check_availability: Not available, alternatives: {alternatives}")
         return {
             "available": False,
             "date": date,
             "time": time,
-            "message": f"Sorry, no tables available at {time}. Alternative times: {', '.join(alternatives)}"
+            "party_size": party_size,
+            "alternatives": alternatives,
+            "message": (f"Sorry, no tables for {party_size} at {time}. Nearest times: {', '.join(alternatives)}"
+                        if alternatives else f"Sorry, no tables for {party_size} left on {date}.")
         }
 
 def get_tool_definition():
@@ -5,7 +5,8 @@ import json
 async def get_current_datetime(params):
     """Get current date and time"""
     print(f"[TOOL] get_current_datetime called")
-    now = datetime.now()
+    # Minute resolution: the result is memoized until the end of the current minute
+    now = datetime.now().replace(second=0, microsecond=0)
     result = {
         "datetime": now.isoformat(),
         "date": now.strftime("%Y-%m-%d"),
@@ -0,0 +1,99 @@
+"""
+Intent matching on caller transcripts for speculative tool calls
+
+The caller's final transcript arrives before the model decides to call a
+tool. Each rule looks for trigger words and, when they appear, names the
+read-only call the model is likely to make next so the bridge can warm it
+in the per-call tool cache. Rules are plain functions of the transcript's
+lower-cased word set and text, so other matchers can be plugged in
+alongside the keyword ones.
+"""
+import os
+import re
+from datetime import datetime, timedelta
+
+SPECULATION = os.getenv('SPECULATION', '1') == '1'
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+MONTHS = ['january', 'february', 'march', 'april', 'may', 'june', 'july',
+          'august', 'september', 'october', 'november', 'december']
+NUMBERS = {'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7,
+           'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12}
+_WORD = re.compile(r"[a-z0-9']+")
+_ISO_DATE = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+_MONTH_DAY = re.compile(r"\b(" + '|'.join(MONTHS) + r")\s+(\d{1,2})(?:st|nd|rd|th)?\b")
+_DAY_MONTH = re.compile(r"\b(\d{1,2})(?:st|nd|rd|th)?\s+(?:of\s+)?(" + '|'.join(MONTHS) + r")\b")
+_CLOCK = re.compile(r"\b(\d{1,2})(?:[:.](\d{2}))?\s*(a\.?\s?m\b\.?|p\.?\s?m\b\.?)|\b(\d{1,2}):(\d{2})\b")
+_PARTY = re.compile(r"\b(?:for|party of|table for)\s+(\d{1,2}|" + '|'.join(NUMBERS) + r")\b(?!\s*(?:am|pm|a\.m|p\.m|:))")
+
+def spoken_date(words, text, today=None):
+    """Date named in the transcript (ISO, month and day, today, tomorrow or a weekday), else None"""
+    today = today or datetime.now()
+    match = _ISO_DATE.search(text)
+    if match:
+        return datetime.strptime(match.group(1), '%Y-%m-%d')
+    match = _MONTH_DAY.search(text) or _DAY_MONTH.search(text)
+    if match:
+        month, day = match.groups() if match.re is _MONTH_DAY else reversed(match.groups())
+        try:
+            date = today.replace(month=MONTHS.index(month) + 1, day=int(day))
+        except ValueError:
+            return None
+        # A month and day already past refers to next year
+        return date if date.date() >= today.date() else date.replace(year=today.year + 1)
+    if 'tomorrow' in words:
+        return today + timedelta(days=1)
+    for i, day in enumerate(WEEKDAYS):
+        if day in words:
+            return today + timedelta(days=(i - today.weekday()) % 7 or 7)
+    if 'today' in words or 'tonight' in words:
+        return today
+    return None
+
+def spoken_time(text):
+    """Time of day as HH:MM ("7 pm", "7:30 p.m.", "19:30"), else None"""
+    match = _CLOCK.search(text)
+    if not match:
+        return None
+    hour, minute, meridiem, hour24, minute24 = match.groups()
+    if hour24 is not None:
+        hour, minute = int(hour24), int(minute24)
+    else:
+        hour, minute = int(hour) % 12, int(minute or 0)
+        if meridiem.startswith('p'):
+            hour += 12
+    if hour > 23 or minute > 59:
+        return None
+    return f"{hour:02d}:{minute:02d}"
+
+def availability_rule(words, text):
+    date, time = spoken_date(words, text), spoken_time(text)
+    if date is None or time is None:
+        return []
+    params = {"date": date.strftime('%Y-%m-%d'), "time": time}
+    party = _PARTY.search(text)
+    if party:
+        size = party.group(1)
+        params["party_size"] = NUMBERS.get(size) or int(size)
+    return [("check_availability", params)]
+
+# get_menu is not speculated: it is pre-serialized and memoized per worker
+RULES = [availability_rule]
+
+class IntentMatcher:
+    """Maps a transcript to the (tool_name, params) calls the rules predict"""
+
+    def __init__(self, rules=RULES):
+        self.rules = list(rules)
+
+    def match(self, transcript):
+        if not SPECULATION:
+            return []
+        text = transcript.lower()
+        words = set(_WORD.findall(text))
+        calls = []
+        for rule in self.rules:
+            calls.extend(call for call in rule(words, text) if call not in calls)
+        return calls
+
+intent_matcher = IntentMatcher()
@@ -1,27 +1,20 @@
 import sys
 sys.path.append('..')
-from restaurant_data import MENU
+from menu_catalog import catalog
 import json
 
 async def get_menu(params):
-    """Get restaurant menu"""
+    """Get restaurant menu, as pre-serialized JSON"""
     print(f"[TOOL] get_menu called with params: {params}")
     category = params.get("category")
     
-    if category and category in MENU:
-        result = {
-            "category": category,
-            "items": MENU[category]
-        }
+    if category and category in catalog.category_json:
         print(f"[TOOL] get_menu returning category: {category}")
-        return result
+        return catalog.category_json[category]
     
     # Return full menu
     print(f"[TOOL] get_menu returning full menu")
-    return {
-        "menu": MENU,
-        "categories": list(MENU.keys())
-    }
+    return catalog.full_json
 
 def get_tool_definition():
     return {
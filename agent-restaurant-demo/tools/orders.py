@@ -1,6 +1,7 @@
 import sys
 sys.path.append('..')
-from restaurant_data import ORDERS, MENU, TAX_RATE
+from restaurant_data import ORDERS, TAX_RATE
+from menu_catalog import catalog
 from datetime import datetime
 import uuid
 import json
@@ -39,24 +40,19 @@ async def add_item_to_order(params):
     """Add item to an existing order"""
     print(f"[TOOL] add_item_to_order called with params: {params}")
     order_id = params.get("order_id")
-    item_id = params.get("item_id")
+    item_ref = params.get("item_id") or params.get("item_name")
     quantity = params.get("quantity", 1)
     
     if order_id not in ORDERS:
         return {"error": f"Order {order_id} not found"}
     
-    # Find item in menu
-    item = None
-    for category in MENU.values():
-        for menu_item in category:
-            if menu_item["id"] == item_id:
-                item = menu_item
-                break
-        if item:
-            break
+    # Find item in menu by id or spoken name
+    item = catalog.find(item_ref)
     
     if not item:
-        return {"error": f"Item {item_id} not found in menu"}
+        suggestions = catalog.suggestions(item_ref)
+        hint = f". Ask the customer whether they meant: {', '.join(suggestions)}" if suggestions else ""
+        return {"error": f"Item {item_ref} not found in menu{hint}"}
     
     # Add to order
     order_item = {
@@ -181,7 +177,7 @@ def get_tool_definitions():
         {
             "toolSpec": {
                 "name": "add_item_to_order",
-                "description": "Add a menu item to an existing order",
+                "description": "Add a menu item to an existing order, by item ID or by name",
                 "inputSchema": {
                     "json": json.dumps({
                         "type": "object",
@@ -194,12 +190,16 @@ def get_tool_definitions():
                                 "type": "string",
                                 "description": "Menu item ID (e.g., main1, app2)"
                             },
+                            "item_name": {
+                                "type": "string",
+                                "description": "Menu item name as the customer said it (e.g., garlic naan), if the ID is not known"
+                            },
                             "quantity": {
                                 "type": "integer",
                                 "description": "Quantity of the item"
                             }
                         },
-                        "required": ["order_id", "item_id"]
+                        "required": ["order_id"]
                     })
                 }
             }
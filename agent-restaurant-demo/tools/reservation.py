@@ -1,6 +1,7 @@
 import sys
 sys.path.append('..')
-from restaurant_data import RESERVATIONS, AVAILABILITY
+from restaurant_data import RESERVATIONS, next_reservation_id
+from inventory import inventory
 from datetime import datetime
 import json
 
@@ -16,28 +17,38 @@ async def create_reservation(params):
     if not all([date, time, party_size, name]):
         return {"error": "Date, time, party size, and name are required"}
     
-    # Check availability
-    if date not in AVAILABILITY or time not in AVAILABILITY[date]:
-        return {"error": f"Invalid date or time slot"}
+    party_size = int(party_size)
+    if party_size < 1:
+        return {"error": "Party size must be at least 1"}
     
-    if AVAILABILITY[date][time] <= 0:
-        return {"error": f"No tables available at {time} on {date}"}
+    if not inventory.has_slot(date, time):
+        return {"error": f"Invalid date or time slot"}
     
-    # Create reservation
-    reservation_id = f"RES{len(RESERVATIONS) + 1:04d}"
-    reservation = {
-        "reservation_id": reservation_id,
-        "date": date,
-        "time": time,
-        "party_size": party_size,
-        "name": name,
-        "phone": phone,
-        "status": "confirmed",
-        "created_at": datetime.now().isoformat()
-    }
+    # Hold the smallest table that seats the party, then confirm it
+    hold_id = inventory.hold(date, time, party_size)
+    if hold_id is None:
+        alternatives = inventory.nearest(date, time, party_size)
+        hint = f" Nearest times: {', '.join(alternatives)}" if alternatives else ""
+        return {"error": f"No tables for {party_size} available at {time} on {date}.{hint}"}
     
-    RESERVATIONS.append(reservation)
-    AVAILABILITY[date][time] -= 1  # Reduce available tables
+    try:
+        reservation_id = next_reservation_id()
+        reservation = {
+            "reservation_id": reservation_id,
+            "date": date,
+            "time": time,
+            "party_size": party_size,
+            "table_size": inventory.table_of(hold_id),
+            "name": name,
+            "phone": phone,
+            "status": "confirmed",
+            "created_at": datetime.now().isoformat()
+        }
+        RESERVATIONS.append(reservation)
+    except BaseException:
+        inventory.release(hold_id)
+        raise
+    inventory.commit(hold_id)
     
     print(f"[TOOL] create_reservation: Created {reservation_id} for {name}")
     return {
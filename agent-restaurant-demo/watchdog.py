@@ -0,0 +1,106 @@
+"""
+Event-loop stall detector
+
+A coroutine on the loop bumps a heartbeat; a daemon thread checks it and,
+when the loop has not run for longer than the threshold, captures the loop
+thread's current stack so the blocking call is named in the logs and in
+voice_loop_stalls_total{location}.
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+from metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+# Report when the loop has not run for this long; 0 disables the watchdog
+STALL_THRESHOLD_MS = float(os.getenv("STALL_THRESHOLD_MS", "200"))
+HEARTBEAT_INTERVAL = 0.05
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+loop_stalls = Counter("voice_loop_stalls_total", "Event-loop stalls past the threshold, by blocking code location",
+                      ("location",))
+
+
+def _location(stack):
+    """Innermost frame in application code, falling back to the innermost frame"""
+    for frame in reversed(stack):
+        filename = os.path.abspath(frame.filename)
+        if filename.startswith(APP_DIR + os.sep) and "site-packages" not in filename and filename != os.path.abspath(__file__):
+            return f"{os.path.relpath(filename, APP_DIR)}:{frame.lineno} ({frame.name})"
+    frame = stack[-1]
+    return f"{frame.filename}:{frame.lineno} ({frame.name})"
+
+
+class LoopWatchdog:
+    """Samples event-loop responsiveness from a separate thread"""
+
+    def __init__(self, threshold_ms=STALL_THRESHOLD_MS):
+        self.threshold = threshold_ms / 1000
+        self.stats = {"stalls": 0}
+        self.by_location = {}
+        self._last_beat = time.monotonic()
+        self._loop_thread_id = None
+        self._heartbeat_task = None
+        self._thread = None
+        self._stopped = threading.Event()
+
+    async def start(self):
+        """Start the heartbeat on the running loop and the watchdog thread"""
+        if not self.threshold or self._thread is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        self._stopped.set()
+        if self._heartbeat_task and not self._heartbeat_task.done():
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    async def _heartbeat(self):
+        while True:
+            self._last_beat = time.monotonic()
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+    def _watch(self):
+        reported_beat = None
+        while not self._stopped.wait(HEARTBEAT_INTERVAL):
+            beat = self._last_beat
+            stalled = time.monotonic() - beat
+            # One report per stall: the heartbeat has not moved since we last reported
+            if stalled < self.threshold or beat == reported_beat:
+                continue
+            reported_beat = beat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)
+            self._report(stalled, stack)
+
+    def _report(self, stalled, stack):
+        location = _location(stack)
+        self.stats["stalls"] += 1
+        self.by_location[location] = self.by_location.get(location, 0) + 1
+        loop_stalls.inc(location)
+        logger.warning(f"⚠️ Event loop stalled for {stalled * 1000:.0f} ms in {location}\n"
+                       + "".join(traceback.format_list(stack[-8:])))
+
+
+loop_watchdog = LoopWatchdog()
@@ -0,0 +1,182 @@
+import array
+import asyncio
+import logging
+import math
+import os
+import time
+
+from metrics import CallbackMetric
+
+logger = logging.getLogger(__name__)
+
+# Concurrent calls a single worker process will take; 0 means unlimited
+MAX_CALLS_PER_WORKER = int(os.getenv("MAX_CALLS_PER_WORKER", "0"))
+# Shed new calls while the event loop lags or the worker's core is saturated; 0 disables
+MAX_LOOP_LAG_MS = float(os.getenv("ADMISSION_MAX_LOOP_LAG_MS", "100"))
+MAX_CPU_PERCENT = float(os.getenv("ADMISSION_MAX_CPU_PERCENT", "90"))
+SAMPLE_INTERVAL = 0.5
+# Seconds a draining worker waits for active calls before cutting them
+DRAIN_TIMEOUT = float(os.getenv("DRAIN_TIMEOUT", "300"))
+SMOOTHING = 0.3
+
+BUSY_ANNOUNCEMENT_PATH = os.getenv("BUSY_ANNOUNCEMENT_PATH", "busy.raw")
+FRAME_BYTES = 640  # 20ms of 16kHz 16-bit mono audio, as Vonage expects
+FRAME_SECONDS = 0.02
+
+_busy_audio = None
+
+
+class AdmissionController:
+    """Decides whether this worker can take another call without degrading the ones it has"""
+
+    def __init__(self, max_sessions=MAX_CALLS_PER_WORKER, max_loop_lag_ms=MAX_LOOP_LAG_MS,
+                 max_cpu_percent=MAX_CPU_PERCENT):
+        self.max_sessions = max_sessions
+        self.max_loop_lag_ms = max_loop_lag_ms
+        self.max_cpu_percent = max_cpu_percent
+        self.active_sessions = 0
+        self.loop_lag_ms = 0.0
+        self.cpu_percent = 0.0
+        self._monitor_task = None
+        self.draining = False
+        self.drain_deadline = None
+        self.deadline_passed = False
+        self.stats = {"admitted": 0, "shed": 0}
+        self.shed_by_reason = {"draining": 0, "sessions": 0, "loop_lag": 0, "cpu": 0}
+        self.drain_stats = {"drained": 0, "cut": 0}
+
+    async def start(self):
+        """Start sampling event-loop lag and CPU"""
+        if self._monitor_task is None:
+            self._monitor_task = asyncio.create_task(self._monitor())
+
+    async def stop(self):
+        if self._monitor_task and not self._monitor_task.done():
+            self._monitor_task.cancel()
+            try:
+                await self._monitor_task
+            except asyncio.CancelledError:
+                pass
+
+    async def _monitor(self):
+        last_wall = time.monotonic()
+        last_cpu = time.process_time()
+        while True:
+            await asyncio.sleep(SAMPLE_INTERVAL)
+            wall = time.monotonic()
+            cpu = time.process_time()
+            elapsed = wall - last_wall
+            lag_ms = max(elapsed - SAMPLE_INTERVAL, 0.0) * 1000
+            cpu_percent = (cpu - last_cpu) / elapsed * 100 if elapsed > 0 else 0.0
+            self.loop_lag_ms += SMOOTHING * (lag_ms - self.loop_lag_ms)
+            self.cpu_percent += SMOOTHING * (cpu_percent - self.cpu_percent)
+            last_wall, last_cpu = wall, cpu
+
+    def _shed_reason(self):
+        if self.draining:
+            return "draining"
+        if self.max_sessions and self.active_sessions >= self.max_sessions:
+            return "sessions"
+        if self.max_loop_lag_ms and self.loop_lag_ms > self.max_loop_lag_ms:
+            return "loop_lag"
+        if self.max_cpu_percent and self.cpu_percent > self.max_cpu_percent:
+            return "cpu"
+        return None
+
+    def try_admit(self):
+        """Reserve a call slot, returning False when the call should be shed"""
+        reason = self._shed_reason()
+        if reason:
+            self.stats["shed"] += 1
+            self.shed_by_reason[reason] += 1
+            logger.warning(f"Shedding call ({reason}): {self.active_sessions} active, "
+                           f"loop lag {self.loop_lag_ms:.0f} ms, CPU {self.cpu_percent:.0f}%")
+            return False
+        self.active_sessions += 1
+        self.stats["admitted"] += 1
+        return True
+
+    def release(self):
+        self.active_sessions = max(self.active_sessions - 1, 0)
+        # Calls closed after the deadline were already counted as cut
+        if self.draining and not self.deadline_passed:
+            self.drain_stats["drained"] += 1
+
+    def begin_drain(self, timeout=DRAIN_TIMEOUT):
+        """Stop admitting calls and give the active ones until the deadline to finish"""
+        if self.draining:
+            return
+        self.draining = True
+        self.drain_deadline = time.monotonic() + timeout
+        logger.info(f"Draining {self.active_sessions} active call(s), deadline {timeout:.0f}s")
+
+    def drain_complete(self):
+        """True once a drain has no calls left or has hit its deadline; remaining calls count as cut"""
+        if not self.draining:
+            return False
+        if self.deadline_passed:
+            return True
+        if self.active_sessions and time.monotonic() < self.drain_deadline:
+            return False
+        self.deadline_passed = True
+        self.drain_stats["cut"] = self.active_sessions
+        return True
+
+
+def _busy_tone(seconds=3.0, sample_rate=16000):
+    """North American busy signal: 480 Hz + 620 Hz, half a second on, half off"""
+    samples = array.array("h")
+    for n in range(int(seconds * sample_rate)):
+        t = n / sample_rate
+        if t % 1.0 < 0.5:
+            value = 0.25 * (math.sin(2 * math.pi * 480 * t) + math.sin(2 * math.pi * 620 * t))
+            samples.append(int(value * 32767))
+        else:
+            samples.append(0)
+    return samples.tobytes()
+
+
+def load_busy_announcement():
+    """Load and cache the "all lines busy" audio (16kHz 16-bit mono PCM)"""
+    global _busy_audio
+    if _busy_audio is None:
+        try:
+            with open(BUSY_ANNOUNCEMENT_PATH, 'rb') as f:
+                _busy_audio = f.read()
+        except FileNotFoundError:
+            _busy_audio = _busy_tone()
+    return _busy_audio
+
+
+async def play_busy_announcement(websocket):
+    """Play the busy announcement to a shed caller and close the websocket cleanly"""
+    try:
+        await websocket.accept()
+        audio = load_busy_announcement()
+        next_frame = time.monotonic()
+        for i in range(0, len(audio), FRAME_BYTES):
+            await websocket.send_bytes(audio[i:i + FRAME_BYTES])
+            next_frame += FRAME_SECONDS
+            await asyncio.sleep(max(next_frame - time.monotonic(), 0))
+        await websocket.close(code=1000)
+    except Exception as e:
+        logger.info(f"Busy announcement interrupted: {e}")
+
+
+admission_controller = AdmissionController()
+
+CallbackMetric("voice_active_calls", "Calls currently admitted on this worker",
+               lambda: admission_controller.active_sessions)
+CallbackMetric("voice_event_loop_lag_seconds", "Smoothed event-loop scheduling lag",
+               lambda: admission_controller.loop_lag_ms / 1000)
+CallbackMetric("voice_process_cpu_percent", "Smoothed CPU use of this worker process",
+               lambda: admission_controller.cpu_percent)
+CallbackMetric("voice_calls_admitted_total", "Calls admitted", lambda: admission_controller.stats["admitted"],
+               metric_type="counter")
+CallbackMetric("voice_calls_shed_total", "Calls shed with the busy announcement, by reason",
+               lambda: {(reason,): count for reason, count in admission_controller.shed_by_reason.items()},
+               labelnames=("reason",), metric_type="counter")
+CallbackMetric("voice_draining", "1 while this worker is draining for shutdown", lambda: int(admission_controller.draining))
+CallbackMetric("voice_drain_calls_total", "Calls that finished during a drain, or were cut at its deadline",
+               lambda: {(result,): count for result, count in admission_controller.drain_stats.items()},
+               labelnames=("result",), metric_type="counter")
@@ -1,27 +1,153 @@
-import boto3
-import json
+import asyncio
+import logging
 import os
+import time
+from botocore.exceptions import ClientError
+from aws_clients import aws_clients, AWS_REGION
+
+logger = logging.getLogger(__name__)
+
+PERPLEXITY_SECRET = 'sonic2-telephony/perplexity-api-key'
+GOOGLE_TOKEN_SECRET = 'sonic2-telephony/google-token'
+SECRET_NAMES = (PERPLEXITY_SECRET, GOOGLE_TOKEN_SECRET)
+GOOGLE_TOKEN_PATH = '/tmp/token.json'
+
+SECRET_REFRESH_INTERVAL = float(os.getenv("SECRET_REFRESH_INTERVAL", "3600"))
+FETCH_ATTEMPTS = 3
+FETCH_BACKOFF = 0.5
+
+
+class SecretsCache:
+    """In-memory Secrets Manager cache that only re-fetches a secret when its version changes"""
+
+    def __init__(self, names=SECRET_NAMES, region=AWS_REGION):
+        self.names = names
+        self.region = region
+        self.values = {}
+        self.versions = {}
+        self._listeners = {}
+        self._refresh_task = None
+        self.stats = {"checks": 0, "fetches": 0, "failures": 0}
+
+    def get(self, name):
+        return self.values.get(name)
+
+    def on_change(self, name, callback):
+        """Call callback(value) now if the secret is loaded, and again whenever it rotates"""
+        self._listeners.setdefault(name, []).append(callback)
+        if name in self.values:
+            callback(self.values[name])
+
+    async def start(self):
+        """Load secrets off the event loop and keep checking them for rotation"""
+        await self.refresh()
+        if self._refresh_task is None and SECRET_REFRESH_INTERVAL > 0:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._refresh_task and not self._refresh_task.done():
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+        self._refresh_task = None
+
+    async def refresh(self):
+        changed = await asyncio.to_thread(self._sync_all)
+        self._notify(changed)
+
+    def refresh_blocking(self):
+        """Synchronous refresh for scripts and tests without a running loop"""
+        self._notify(self._sync_all())
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                await asyncio.sleep(SECRET_REFRESH_INTERVAL)
+                await self.refresh()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error refreshing secrets: {e}")
+
+    def _sync_all(self):
+        return [name for name in self.names if self._sync(name)]
+
+    def _sync(self, name):
+        """Fetch the secret if its current version differs from the cached one; True when it changed"""
+        client = aws_clients.client('secretsmanager', self.region)
+        for attempt in range(FETCH_ATTEMPTS):
+            try:
+                self.stats["checks"] += 1
+                version = self._current_version(client, name)
+                if version is not None and version == self.versions.get(name):
+                    return False
+                kwargs = {'VersionId': version} if version else {}
+                response = client.get_secret_value(SecretId=name, **kwargs)
+                self.stats["fetches"] += 1
+                if response.get('VersionId') and response['VersionId'] == self.versions.get(name):
+                    return False
+                self.versions[name] = response.get('VersionId', version)
+                self.values[name] = response['SecretString']
+                logger.info(f"Loaded secret {name} (version {self.versions[name]})")
+                return True
+            except client.exceptions.ResourceNotFoundException:
+                logger.warning(f"Secret {name} not found")
+                return False
+            except Exception as e:
+                if attempt == FETCH_ATTEMPTS - 1:
+                    self.stats["failures"] += 1
+                    logger.error(f"Error getting secret {name}: {e}")
+                    return False
+                time.sleep(FETCH_BACKOFF * 2 ** attempt)
+
+    def _current_version(self, client, name):
+        """Version ID staged AWSCURRENT, or None when DescribeSecret is not permitted"""
+        try:
+            stages = client.describe_secret(SecretId=name).get('VersionIdsToStages', {})
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') == 'AccessDeniedException':
+                return None
+            raise
+        return next((v for v, s in stages.items() if 'AWSCURRENT' in s), None)
+
+    def _notify(self, names):
+        for name in names:
+            for callback in self._listeners.get(name, []):
+                try:
+                    callback(self.values[name])
+                except Exception as e:
+                    logger.error(f"Secret change handler for {name} failed: {e}")
+
+
+secrets_cache = SecretsCache()
+
 
 def get_secret(secret_name, region='us-east-1'):
     """Get secret from AWS Secrets Manager"""
-    client = boto3.client('secretsmanager', region_name=region)
-    try:
-        response = client.get_secret_value(SecretId=secret_name)
-        return response['SecretString']
-    except Exception as e:
-        print(f"Error getting secret {secret_name}: {e}")
-        return None
+    if secret_name not in secrets_cache.values:
+        cache = secrets_cache if region == secrets_cache.region else SecretsCache((secret_name,), region)
+        cache._sync(secret_name)
+        return cache.get(secret_name)
+    return secrets_cache.get(secret_name)
+
+
+def _apply_perplexity_key(value):
+    os.environ['PERPLEXITY_API_KEY'] = value
+
+
+def _apply_google_token(value):
+    # Kept on disk for tools and scripts that read GOOGLE_TOKEN_PATH; written only on rotation
+    with open(GOOGLE_TOKEN_PATH, 'w') as f:
+        f.write(value)
+    os.environ['GOOGLE_TOKEN_PATH'] = GOOGLE_TOKEN_PATH
+
+
+secrets_cache.on_change(PERPLEXITY_SECRET, _apply_perplexity_key)
+secrets_cache.on_change(GOOGLE_TOKEN_SECRET, _apply_google_token)
+
 
 def setup_credentials():
     """Setup credentials from AWS services"""
-    # Get Perplexity API key
-    perplexity_key = get_secret('sonic2-telephony/perplexity-api-key')
-    if perplexity_key:
-        os.environ['PERPLEXITY_API_KEY'] = perplexity_key
-    
-    # Get Google token.json
-    google_token = get_secret('sonic2-telephony/google-token')
-    if google_token:
-        with open('/tmp/token.json', 'w') as f:
-            f.write(google_token)
-        os.environ['GOOGLE_TOKEN_PATH'] = '/tmp/token.json'
+    secrets_cache.refresh_blocking()
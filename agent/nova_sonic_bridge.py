@@ -1,18 +1,31 @@
 import asyncio
 import base64
+import functools
 import json
 import uuid
 import numpy as np
 import time
 import os
-import boto3
+import weakref
 from scipy import signal
-from aws_sdk_bedrock_runtime.client import BedrockRuntimeClient, InvokeModelWithBidirectionalStreamOperationInput
+from aws_sdk_bedrock_runtime.client import InvokeModelWithBidirectionalStreamOperationInput
 from aws_sdk_bedrock_runtime.models import InvokeModelWithBidirectionalStreamInputChunk, BidirectionalInputPayloadPart
-from aws_sdk_bedrock_runtime.config import Config, HTTPAuthSchemeResolver, SigV4AuthScheme
-from smithy_aws_core.credentials_resolvers.environment import EnvironmentCredentialsResolver
 from tools import get_all_tool_definitions, execute_tool
+from tools.tool_cache import ToolCache, ToolMemo
+from tools.registry import is_idempotent, domain_of
+from tools.intents import intent_matcher
+from tool_supervisor import ToolSupervisor
 from config import TIMEZONE_OFFSET
+from aws_clients import aws_clients
+from metrics import CallbackMetric, resample_seconds, encode_seconds, bedrock_events, barge_in_seconds
+
+# Live bridges, for per-call queue depth metrics
+_live_bridges = weakref.WeakSet()
+
+def _event_type(event_json):
+    """Event name from a serialized event without parsing the (possibly large) payload"""
+    start = event_json.find('"', event_json.find('{', 1)) + 1
+    return event_json[start:event_json.find('"', start)]
 
 class NovaSonicBridge:
     def __init__(self, model_id='amazon.nova-2-sonic-v1:0', region='us-east-1'):
@@ -29,6 +42,10 @@ class NovaSonicBridge:
         self.scheduler_paused = asyncio.Event()
         self.scheduler_paused.set()
         self.websocket = None
+        self.tool_memo = ToolMemo()
+        self.tool_supervisor = ToolSupervisor(functools.partial(execute_tool, memo=self.tool_memo))
+        self.tool_cache = ToolCache(self.tool_supervisor.run)
+        _live_bridges.add(self)
     
     async def clear_vonage_buffer(self):
         """Send clear command to Vonage to stop buffered audio playback"""
@@ -37,37 +54,36 @@ class NovaSonicBridge:
             await self.websocket.send_text(clear_command)
             print("Sent clear audio buffer command to Vonage")
 
+    def _drain_audio_queue(self):
+        """Discard audio queued for the caller"""
+        while not self.audio_queue.empty():
+            try:
+                self.audio_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+
     def _resample_audio(self, audio_bytes, from_rate=24000, to_rate=16000):
+        started = time.perf_counter()
         audio_data = np.frombuffer(audio_bytes, dtype=np.int16)
         num_samples = int(len(audio_data) * to_rate / from_rate)
         resampled = signal.resample(audio_data, num_samples)
-        return resampled.astype(np.int16).tobytes()
+        result = resampled.astype(np.int16).tobytes()
+        resample_seconds.observe(time.perf_counter() - started)
+        return result
         
     def _initialize_client(self):
-        session = boto3.Session(region_name=self.region)
-        credentials = session.get_credentials()
-        if credentials:
-            os.environ['AWS_ACCESS_KEY_ID'] = credentials.access_key
-            os.environ['AWS_SECRET_ACCESS_KEY'] = credentials.secret_key
-            if credentials.token:
-                os.environ['AWS_SESSION_TOKEN'] = credentials.token
-        
-        config = Config(
-            endpoint_uri=f"https://bedrock-runtime.{self.region}.amazonaws.com",
-            region=self.region,
-            aws_credentials_identity_resolver=EnvironmentCredentialsResolver(),
-            http_auth_scheme_resolver=HTTPAuthSchemeResolver(),
-            http_auth_schemes={"aws.auth#sigv4": SigV4AuthScheme()}
-        )
-        self.client = BedrockRuntimeClient(config=config)
+        self.client = aws_clients.bedrock_runtime(self.region)
     
     async def send_event(self, event_json):
         event = InvokeModelWithBidirectionalStreamInputChunk(
             value=BidirectionalInputPayloadPart(bytes_=event_json.encode('utf-8'))
         )
         await self.stream.input_stream.send(event)
+        bedrock_events.inc("out", _event_type(event_json))
     
     async def start_session(self):
+        # Opening reads (today's calendar and notes) run while the stream is set up
+        self.tool_cache.prefetch_session_start()
         if not self.client:
             self._initialize_client()
         
@@ -175,8 +191,10 @@ Remember, users can't see what you're doing, so keep them informed through your
     async def send_audio_chunk(self, audio_bytes):
         if not self.is_active:
             return
+        started = time.perf_counter()
         blob = base64.b64encode(audio_bytes).decode('utf-8')
         audio_event = f'{{"event":{{"audioInput":{{"promptName":"{self.prompt_name}","contentName":"{self.audio_content_name}","content":"{blob}"}}}}}}'
+        encode_seconds.observe(time.perf_counter() - started)
         await self.send_event(audio_event)
     
     async def end_audio_input(self):
@@ -187,24 +205,11 @@ Remember, users can't see what you're doing, so keep them informed through your
         return await self.audio_queue.get()
 
     async def internet_search(self, query):
-        api_key = os.getenv("PERPLEXITY_API_KEY", "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")
-        url = "https://api.perplexity.ai/chat/completions"
-        headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
-        payload = {
-            "model": "sonar",
-            "messages": [
-                {"role": "system", "content": "Be precise and concise."},
-                {"role": "user", "content": query['query']}
-            ],
-            "max_tokens": 500,
-            "temperature": 0.7
-        }
-        response = requests.post(url, json=payload, headers=headers)
-        return response.json() if response.status_code == 200 else {"error": response.text}
+        return await execute_tool("internet_search", query)
 
-    async def _handle_tool_use(self, tool_name, tool_use, tool_use_id):
-        # Execute tool asynchronously without blocking conversation
-        asyncio.create_task(self._execute_tool_async(tool_name, tool_use, tool_use_id))
+    def _handle_tool_use(self, tool_name, tool_use, tool_use_id):
+        # Execute tool asynchronously without blocking conversation; the task is owned by this call
+        self.tool_supervisor.spawn(self._execute_tool_async(tool_name, tool_use, tool_use_id))
     
     async def send_text(self, text):
         """Send text to Nova Sonic during conversation"""
@@ -253,7 +258,11 @@ Remember, users can't see what you're doing, so keep them informed through your
         try:
             
             content = json.loads(tool_use.get('content', '{}'))
-            result = await execute_tool(tool_name, content)
+            result = await self.tool_cache.get(tool_name, content)
+            if result is None:
+                if not is_idempotent(tool_name):
+                    self.tool_cache.invalidate(domain_of(tool_name))
+                result = await self.tool_supervisor.run(tool_name, content)
             await self._send_tool_result(content_name, tool_use_id, result)
         except Exception as e:
             await self._send_tool_result(content_name, tool_use_id, {"error": str(e)})
@@ -282,7 +291,8 @@ Remember, users can't see what you're doing, so keep them informed through your
                 "toolResult": {
                     "promptName": self.prompt_name,
                     "contentName": content_name,
-                    "content": json.dumps(result)
+                    # Tools may return pre-serialized JSON
+                    "content": result if isinstance(result, str) else json.dumps(result)
                 }
             }
         }
@@ -299,6 +309,8 @@ Remember, users can't see what you're doing, so keep them informed through your
         await self.send_event(json.dumps(tool_end))
     
     async def end_session(self):
+        self.tool_cache.close()
+        self.tool_supervisor.cancel_all()
         if not self.is_active:
             return
         self.is_active = False
@@ -323,6 +335,8 @@ Remember, users can't see what you're doing, so keep them informed through your
                 if result.value and result.value.bytes_:
                     response_data = result.value.bytes_.decode('utf-8')
                     json_data = json.loads(response_data)
+                    if 'event' in json_data:
+                        bedrock_events.inc("in", next(iter(json_data['event']), "unknown"))
                     
                     if 'event' in json_data and 'audioOutput' in json_data['event']:
                         audio_content = json_data['event']['audioOutput']['content']
@@ -336,25 +350,29 @@ Remember, users can't see what you're doing, so keep them informed through your
                     
                     elif 'event' in json_data and 'textOutput' in json_data['event']:
                         content = json_data['event']['textOutput'].get('content', '')
+                        # Warm the reads the caller's words suggest before the model asks for them
+                        if json_data['event']['textOutput'].get('role') == 'USER':
+                            self.tool_cache.speculate(intent_matcher.match(content))
                         try:
                             content_json = json.loads(content)
                             if content_json.get('interrupted'):
+                                barge_in_started = time.perf_counter()
                                 # Clear Vonage's audio buffer
                                 await self.clear_vonage_buffer()
+                                self._drain_audio_queue()
+                                barge_in_seconds.observe(time.perf_counter() - barge_in_started)
+                                # Drop audio that was still in flight, outside the measured span
                                 await asyncio.sleep(0.1)
-                                
-                                while not self.audio_queue.empty():
-                                    try:
-                                        self.audio_queue.get_nowait()
-                                    except asyncio.QueueEmpty:
-                                        break
+                                self._drain_audio_queue()
                         except json.JSONDecodeError:
                             pass
                     
                     elif 'event' in json_data and 'toolUse' in json_data['event']:
                         tool_use = json_data['event']['toolUse']
-                        asyncio.create_task(self._handle_tool_use(
-                            tool_use['toolName'], tool_use, tool_use['toolUseId']
-                        ))
+                        self._handle_tool_use(tool_use['toolName'], tool_use, tool_use['toolUseId'])
         except Exception as e:
             print(f"Error processing responses: {e}")
+
+CallbackMetric("voice_call_audio_queue_depth", "Audio frames queued for the caller, per call",
+               lambda: {(bridge.prompt_name[:8],): bridge.audio_queue.qsize() for bridge in list(_live_bridges) if bridge.is_active},
+               labelnames=("call",))
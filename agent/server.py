@@ -2,152 +2,84 @@ import asyncio
 import json
 import logging
 import os
-import requests
-from requests.exceptions import RequestException
-from datetime import datetime
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from nova_sonic_bridge import NovaSonicBridge
-from aws_secrets import setup_credentials
+from aws_secrets import secrets_cache
+from credentials import credential_provider
+from aws_clients import aws_clients
+from session_reaper import session_reaper
+from admission import admission_controller, load_busy_announcement, play_busy_announcement
+import metrics
+from watchdog import loop_watchdog
+from tools.notes import notes_index, notes_journal
+from tools.google_calendar import calendar_mirror
 
 # Configure logging
 LOGLEVEL = os.environ.get("LOGLEVEL", "INFO").upper()
 logging.basicConfig(level=LOGLEVEL, format="%(asctime)s %(message)s")
 logger = logging.getLogger(__name__)
 
-credential_refresh_task = None
-
-def get_imdsv2_token():
-    try:
-        response = requests.put(
-            "http://169.254.169.254/latest/api/token",
-            headers={"X-aws-ec2-metadata-token-ttl-seconds": "21600"},
-            timeout=2
-        )
-        if response.status_code == 200:
-            return response.text
-    except Exception:
-        pass
-    return None
-
-def get_credentials_from_imds():
-    result = {"success": False, "credentials": None, "role_name": None, "error": None}
-    try:
-        token = get_imdsv2_token()
-        headers = {"X-aws-ec2-metadata-token": token} if token else {}
-        
-        role_response = requests.get(
-            "http://169.254.169.254/latest/meta-data/iam/security-credentials/",
-            headers=headers, timeout=2
-        )
-        if role_response.status_code != 200:
-            result["error"] = f"Failed to retrieve IAM role name: HTTP {role_response.status_code}"
-            return result
-        
-        role_name = role_response.text.strip()
-        result["role_name"] = role_name
-        
-        creds_response = requests.get(
-            f"http://169.254.169.254/latest/meta-data/iam/security-credentials/{role_name}",
-            headers=headers, timeout=2
-        )
-        if creds_response.status_code != 200:
-            result["error"] = f"Failed to retrieve credentials: HTTP {creds_response.status_code}"
-            return result
-        
-        credentials = creds_response.json()
-        result["success"] = True
-        result["credentials"] = {
-            "AccessKeyId": credentials.get("AccessKeyId"),
-            "SecretAccessKey": credentials.get("SecretAccessKey"),
-            "Token": credentials.get("Token"),
-            "Expiration": credentials.get("Expiration")
-        }
-    except RequestException as e:
-        result["error"] = f"Request exception: {str(e)}"
-    except Exception as e:
-        result["error"] = f"Unexpected error: {str(e)}"
-    return result
-
-async def refresh_credentials_from_imds():
-    logger.info("Starting credential refresh background task")
-    while True:
-        try:
-            imds_result = get_credentials_from_imds()
-            if imds_result["success"]:
-                creds = imds_result["credentials"]
-                os.environ["AWS_ACCESS_KEY_ID"] = creds["AccessKeyId"]
-                os.environ["AWS_SECRET_ACCESS_KEY"] = creds["SecretAccessKey"]
-                os.environ["AWS_SESSION_TOKEN"] = creds["Token"]
-                logger.info(f"✅ Credentials refreshed, expires: {creds['Expiration']}")
-                
-                try:
-                    expiration = datetime.fromisoformat(creds['Expiration'].replace('Z', '+00:00'))
-                    now = datetime.now(expiration.tzinfo)
-                    refresh_interval = min(max((expiration - now).total_seconds() - 300, 60), 3600)
-                except Exception:
-                    refresh_interval = 3600
-                await asyncio.sleep(refresh_interval)
-            else:
-                logger.error(f"Failed to refresh credentials: {imds_result['error']}")
-                await asyncio.sleep(300)
-        except asyncio.CancelledError:
-            break
-        except Exception as e:
-            logger.error(f"Error in credential refresh: {e}")
-            await asyncio.sleep(300)
-
 app = FastAPI(title="Vonage Nova Sonic WebSocket Server")
 
 @app.on_event("startup")
 async def startup_event():
-    global credential_refresh_task
+    await loop_watchdog.start()
     logger.info("🚀 Application starting up...")
     
-    # Setup secrets and credentials
-    setup_credentials()
+    # Credentials are held in memory and refreshed ahead of expiry off the loop
+    await credential_provider.start()
+    await aws_clients.start()
+    
+    # Secrets are cached in memory and re-fetched only when they rotate
+    await secrets_cache.start()
+    # Load the notes date index in the background so the first notes call skips the Drive listing
+    notes_index.start()
+    # Seed the calendar mirror in the background; calendar calls use the API until it is ready
+    calendar_mirror.start()
+    # Resume syncing notes journaled before the last restart
+    await notes_journal.start()
     
-    if os.getenv("AWS_ACCESS_KEY_ID") and os.getenv("AWS_SECRET_ACCESS_KEY"):
-        logger.info("✅ Using credentials from environment variables")
-    else:
-        logger.info("🔄 Fetching credentials from IMDS...")
-        imds_result = get_credentials_from_imds()
-        if imds_result["success"]:
-            creds = imds_result["credentials"]
-            os.environ["AWS_ACCESS_KEY_ID"] = creds["AccessKeyId"]
-            os.environ["AWS_SECRET_ACCESS_KEY"] = creds["SecretAccessKey"]
-            os.environ["AWS_SESSION_TOKEN"] = creds["Token"]
-            logger.info(f"✅ Initial credentials loaded from IMDS")
-            credential_refresh_task = asyncio.create_task(refresh_credentials_from_imds())
-        else:
-            logger.error(f"❌ Failed to fetch credentials: {imds_result['error']}")
+    load_busy_announcement()
+    await admission_controller.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    global credential_refresh_task
-    if credential_refresh_task and not credential_refresh_task.done():
-        credential_refresh_task.cancel()
-        try:
-            await credential_refresh_task
-        except asyncio.CancelledError:
-            pass
+    await notes_journal.stop()
+    await calendar_mirror.stop()
+    await credential_provider.stop()
+    await secrets_cache.stop()
+    await admission_controller.stop()
+    await loop_watchdog.stop()
+    await session_reaper.close()
 
 @app.get("/ping")
 @app.get("/")
 async def health_check():
+    if admission_controller.draining:
+        # Not ready: load balancers should stop sending calls to this node
+        return JSONResponse({"status": "draining"}, status_code=503)
     return JSONResponse({"status": "healthy"})
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     logger.info(f"WebSocket connection from: {websocket.client}")
-    await websocket.accept()
-    print(websocket.url)
+    if not admission_controller.try_admit():
+        # Over budget: tell the caller all lines are busy instead of starting a model session
+        await play_busy_announcement(websocket)
+        return
     aws_region = os.getenv("AWS_DEFAULT_REGION", "us-east-1")
     nova_bridge = NovaSonicBridge(region=aws_region)
     nova_bridge.websocket = websocket
     response_task = None
     
     try:
+        await websocket.accept()
+        print(websocket.url)
         await nova_bridge.start_session()
         await nova_bridge.start_audio_input()
         
@@ -175,14 +107,9 @@ async def websocket_endpoint(websocket: WebSocket):
     except Exception as e:
         logger.error(f"Error: {e}")
     finally:
-        await nova_bridge.end_audio_input()
-        await nova_bridge.end_session()
-        if response_task:
-            response_task.cancel()
-            try:
-                await response_task
-            except asyncio.CancelledError:
-                pass
+        # Teardown runs in the background so the handler returns immediately
+        session_reaper.reap(nova_bridge, response_task)
+        admission_controller.release()
 
 async def handle_audio_responses(websocket: WebSocket, nova_bridge: NovaSonicBridge):
     try:
@@ -194,5 +121,5 @@ async def handle_audio_responses(websocket: WebSocket, nova_bridge: NovaSonicBri
         logger.error(f"Audio response error: {e}")
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8080)
+    import launcher
+    launcher.run("server:app", host="0.0.0.0", port=8080)
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import os
+import time
+import weakref
+
+from metrics import CallbackMetric
+
+logger = logging.getLogger(__name__)
+
+TEARDOWN_TIMEOUT = float(os.getenv("TEARDOWN_TIMEOUT", "5"))
+SLOW_TEARDOWN_SECONDS = float(os.getenv("SLOW_TEARDOWN_SECONDS", "1"))
+
+
+class SessionReaper:
+    """Tears down finished call sessions in the background with a bounded time budget"""
+
+    def __init__(self, timeout=TEARDOWN_TIMEOUT, slow_threshold=SLOW_TEARDOWN_SECONDS):
+        self.timeout = timeout
+        self.slow_threshold = slow_threshold
+        self._tasks = set()
+        self._bridges = weakref.WeakSet()
+        self.stats = {
+            "scheduled": 0,
+            "completed": 0,
+            "failed": 0,
+            "timed_out": 0,
+            "slow": 0,
+        }
+
+    def reap(self, nova_bridge, response_task=None):
+        """Schedule teardown of a session and return immediately"""
+        if response_task and not response_task.done():
+            response_task.cancel()
+        self._bridges.add(nova_bridge)
+        self.stats["scheduled"] += 1
+        task = asyncio.create_task(self._teardown(nova_bridge, response_task))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _teardown(self, nova_bridge, response_task):
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(self._close(nova_bridge, response_task), timeout=self.timeout)
+            self.stats["completed"] += 1
+        except asyncio.TimeoutError:
+            self.stats["timed_out"] += 1
+            logger.warning(f"Session teardown exceeded {self.timeout}s, abandoning")
+            self._abandon(nova_bridge, response_task)
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.warning(f"Session teardown failed: {e}")
+            self._abandon(nova_bridge, response_task)
+        finally:
+            nova_bridge.websocket = None
+            elapsed = time.monotonic() - started
+            if elapsed > self.slow_threshold:
+                self.stats["slow"] += 1
+                logger.info(f"Slow session teardown: {elapsed:.2f}s")
+
+    async def _close(self, nova_bridge, response_task):
+        # The stream may already be broken by the hangup, so a failed
+        # contentEnd must not prevent the session from being ended.
+        try:
+            await nova_bridge.end_audio_input()
+        except Exception as e:
+            logger.debug(f"end_audio_input failed during teardown: {e}")
+        try:
+            await nova_bridge.end_session()
+        finally:
+            if response_task:
+                # wait() absorbs the response task's own error or cancellation
+                # but not ours, so a teardown timeout still reaches wait_for
+                await asyncio.wait([response_task])
+                if not response_task.cancelled() and response_task.exception():
+                    logger.debug(f"Response task failed during teardown: {response_task.exception()}")
+
+    def _abandon(self, nova_bridge, response_task):
+        nova_bridge.is_active = False
+        # Runs from the teardown's error paths, so it must not raise itself
+        supervisor = getattr(nova_bridge, "tool_supervisor", None)
+        if supervisor is not None:
+            try:
+                supervisor.cancel_all()
+            except Exception as e:
+                logger.warning(f"Cancelling tool tasks failed during teardown: {e}")
+        for task in (response_task, nova_bridge.response):
+            if task and not task.done():
+                task.cancel()
+
+    def pending(self):
+        """Number of teardowns still in flight"""
+        return len(self._tasks)
+
+    def alive_sessions(self):
+        """Number of reaped sessions not yet garbage collected"""
+        return len(self._bridges)
+
+    async def close(self):
+        """Wait for in-flight teardowns on shutdown"""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+session_reaper = SessionReaper()
+
+CallbackMetric("voice_teardowns_total", "Session teardowns by outcome",
+               lambda: {(result,): session_reaper.stats[result] for result in ("completed", "failed", "timed_out")},
+               labelnames=("result",), metric_type="counter")
+CallbackMetric("voice_teardowns_slow_total", "Session teardowns slower than the slow threshold",
+               lambda: session_reaper.stats["slow"], metric_type="counter")
+CallbackMetric("voice_teardowns_pending", "Session teardowns still in flight", session_reaper.pending)
+CallbackMetric("voice_sessions_alive_after_hangup", "Hung-up sessions not yet garbage collected",
+               session_reaper.alive_sessions)
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import os
+import time
+
+from metrics import CallbackMetric
+
+logger = logging.getLogger(__name__)
+
+TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT", "20"))
+# Per-tool overrides, e.g. "internet_search=15,list_calendar_events=10"
+TOOL_TIMEOUTS = {
+    name.strip(): float(seconds)
+    for name, _, seconds in (item.partition("=") for item in os.getenv("TOOL_TIMEOUTS", "").split(",") if item)
+}
+# Per worker, across all calls
+TOOL_MAX_CONCURRENT = int(os.getenv("TOOL_MAX_CONCURRENT", "64"))
+TOOL_MAX_CONCURRENT_PER_TOOL = int(os.getenv("TOOL_MAX_CONCURRENT_PER_TOOL", "16"))
+
+_limits = {}  # tool name -> Semaphore, None -> worker-wide Semaphore
+
+stats = {"started": 0, "completed": 0, "failed": 0, "timed_out": 0, "cancelled": 0}
+_load = {"running": 0, "queued": 0}
+
+
+def tool_timeout(tool_name):
+    return TOOL_TIMEOUTS.get(tool_name, TOOL_TIMEOUT)
+
+
+def _limit(tool_name):
+    limit = _limits.get(tool_name)
+    if limit is None:
+        size = TOOL_MAX_CONCURRENT if tool_name is None else TOOL_MAX_CONCURRENT_PER_TOOL
+        limit = _limits[tool_name] = asyncio.Semaphore(size)
+    return limit
+
+
+class ToolSupervisor:
+    """Runs one call's tool executions with timeouts, concurrency limits and cancellation on hangup"""
+
+    def __init__(self, execute):
+        self.execute = execute  # async (tool_name, params) -> result
+        self._tasks = set()
+
+    def spawn(self, coro):
+        """Run a tool-handling coroutine as a task owned by this call"""
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def run(self, tool_name, params):
+        """Execute a tool under the limits; a timeout becomes a structured result for the model"""
+        timeout = tool_timeout(tool_name)
+        stats["started"] += 1
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(self._limited(tool_name, params), timeout)
+        except asyncio.TimeoutError:
+            stats["timed_out"] += 1
+            logger.warning(f"Tool {tool_name} timed out after {timeout:g}s")
+            return {"error": f"{tool_name} did not finish within {timeout:g} seconds",
+                    "timed_out": True, "elapsed_seconds": round(time.monotonic() - started, 1)}
+        except asyncio.CancelledError:
+            stats["cancelled"] += 1
+            raise
+        except Exception:
+            stats["failed"] += 1
+            raise
+        stats["completed"] += 1
+        return result
+
+    async def _limited(self, tool_name, params):
+        global_limit, limit = _limit(None), _limit(tool_name)
+        _load["queued"] += 1
+        try:
+            # Per-tool first, so a call queued behind a busy tool does not hold a worker-wide slot
+            await limit.acquire()
+            try:
+                await global_limit.acquire()
+            except BaseException:
+                limit.release()
+                raise
+        finally:
+            _load["queued"] -= 1
+        _load["running"] += 1
+        try:
+            return await self.execute(tool_name, params)
+        finally:
+            _load["running"] -= 1
+            limit.release()
+            global_limit.release()
+
+    def cancel_all(self):
+        """Cancel every tool task still running for this call"""
+        for task in list(self._tasks):
+            task.cancel()
+
+    def pending(self):
+        return len(self._tasks)
+
+
+CallbackMetric("voice_tool_runs_total", "Supervised tool executions by outcome",
+               lambda: {(k,): v for k, v in stats.items()}, ("result",), "counter")
+CallbackMetric("voice_tools_running", "Tool executions running on this worker", lambda: _load["running"])
+CallbackMetric("voice_tools_queued", "Tool executions waiting for a concurrency slot", lambda: _load["queued"])
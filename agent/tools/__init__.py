@@ -1,19 +1,27 @@
+import asyncio
+import time
+
+from metrics import tool_latency_seconds, tool_round_trips, tool_calls_collapsed
+from .google_io import count_round_trips
 from .internet_search import internet_search, get_tool_definition as get_internet_search_tool
 from .google_calendar import create_calendar_event, list_calendar_events, update_calendar_event, delete_calendar_event, get_tool_definitions as get_calendar_tools
 from .notes import read_notes, update_notes, get_tool_definitions as get_notes_tools
 from .datetime_info import get_current_datetime, get_tool_definition as get_datetime_tool
+from .registry import TOOLS, register, is_idempotent, domain_of
+from .tool_cache import cache_key
+
+# Registry of all available tools, with what may be reused and what each write invalidates
+register("internet_search", internet_search, idempotent=True, domain="search")  # Cached by search_cache
+register("create_calendar_event", create_calendar_event, domain="calendar")
+register("list_calendar_events", list_calendar_events, idempotent=True, scope="call", ttl=60, domain="calendar")
+register("update_calendar_event", update_calendar_event, domain="calendar")
+register("delete_calendar_event", delete_calendar_event, domain="calendar")
+register("read_notes", read_notes, idempotent=True, scope="call", ttl=60, domain="notes")
+register("update_notes", update_notes, domain="notes")
+register("get_current_datetime", get_current_datetime, idempotent=True, scope="process", ttl=60, domain="clock")
 
-# Registry of all available tools
-TOOLS = {
-    "internet_search": internet_search,
-    "create_calendar_event": create_calendar_event,
-    "list_calendar_events": list_calendar_events,
-    "update_calendar_event": update_calendar_event,
-    "delete_calendar_event": delete_calendar_event,
-    "read_notes": read_notes,
-    "update_notes": update_notes,
-    "get_current_datetime": get_current_datetime
-}
+# Canonical call -> [shared task, number of callers waiting on it]
+_inflight = {}
 
 def get_all_tool_definitions():
     """Get all tool definitions for Nova Sonic"""
@@ -24,9 +32,56 @@ def get_all_tool_definitions():
         get_datetime_tool()
     ]
 
-async def execute_tool(tool_name, tool_input):
-    """Execute a tool by name"""
-    if tool_name in TOOLS:
+async def _run(tool_name, tool_input):
+    started = time.perf_counter()
+    round_trips = count_round_trips()
+    try:
         return await TOOLS[tool_name](tool_input)
-    return {"error": f"Unknown tool: {tool_name}"}
+    finally:
+        tool_latency_seconds.observe(time.perf_counter() - started, tool_name)
+        tool_round_trips.observe(round_trips[0], tool_name)
+
+async def _single_flight(tool_name, tool_input):
+    """Join an identical call already in flight, or start one that later callers can join"""
+    key = cache_key(tool_name, tool_input)
+    entry = _inflight.get(key)
+    if entry is None:
+        task = asyncio.create_task(_run(tool_name, tool_input))
+        entry = _inflight[key] = [task, 0]
+        task.add_done_callback(lambda _: _forget(key, entry))
+    else:
+        tool_calls_collapsed.inc(tool_name)
+    entry[1] += 1
+    try:
+        return await asyncio.shield(entry[0])
+    finally:
+        entry[1] -= 1
+        # The last caller to give up (e.g. on hangup) cancels the shared execution;
+        # it leaves the map first so a new identical call starts afresh instead of joining it
+        if entry[1] == 0 and not entry[0].done():
+            _forget(key, entry)
+            entry[0].cancel()
+
+def _forget(key, entry):
+    if _inflight.get(key) is entry:
+        del _inflight[key]
+
+async def execute_tool(tool_name, tool_input, memo=None):
+    """Execute a tool by name, reusing memoized results from the call's ToolMemo when given"""
+    if tool_name not in TOOLS:
+        return {"error": f"Unknown tool: {tool_name}"}
+    if not is_idempotent(tool_name):
+        try:
+            return await _run(tool_name, tool_input)
+        finally:
+            if memo is not None:
+                memo.invalidate(domain_of(tool_name))
+    if memo is not None:
+        result = memo.get(tool_name, tool_input)
+        if result is not None:
+            return result
+    result = await _single_flight(tool_name, tool_input)
+    if memo is not None:
+        memo.put(tool_name, tool_input, result)
+    return result
 
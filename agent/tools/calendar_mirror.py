@@ -0,0 +1,170 @@
+"""
+In-memory mirror of the primary Google Calendar
+
+A full listing started at server startup seeds the mirror and Calendar
+incremental sync (syncToken) keeps it fresh in the background; until the
+first listing completes, queries go to the API. events are indexed by start time so
+time-window queries are answered without an API round trip. Tool writes
+update the mirror directly (write-through).
+"""
+import asyncio
+import logging
+import os
+import sys
+import time
+from bisect import bisect_left, insort
+from itertools import islice
+from datetime import datetime, timedelta
+from googleapiclient.errors import HttpError
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config import TIMEZONE_OFFSET
+from .google_io import execute
+
+logger = logging.getLogger(__name__)
+
+CALENDAR_MIRROR = os.getenv('CALENDAR_MIRROR', '1') == '1'
+CALENDAR_SYNC_INTERVAL = float(os.getenv('CALENDAR_SYNC_INTERVAL', '30'))
+# Serve from the mirror only while it is this fresh; otherwise fall back to the API
+CALENDAR_MAX_STALENESS = float(os.getenv('CALENDAR_MAX_STALENESS', '120'))
+# How far back the mirror reaches; older queries go to the API
+CALENDAR_MIRROR_HISTORY_DAYS = int(os.getenv('CALENDAR_MIRROR_HISTORY_DAYS', '7'))
+
+def _parse_time(when):
+    """Aware datetime for an event start/end ({'dateTime': ...} or all-day {'date': ...})"""
+    if 'dateTime' in when:
+        return datetime.fromisoformat(when['dateTime'].replace('Z', '+00:00'))
+    return datetime.fromisoformat(f"{when['date']}T00:00:00{TIMEZONE_OFFSET}")
+
+class CalendarMirror:
+    """Start-time indexed copy of calendar events kept current with incremental sync"""
+
+    def __init__(self, service_factory, calendar_id='primary'):
+        self.service_factory = service_factory
+        self.calendar_id = calendar_id
+        self.enabled = CALENDAR_MIRROR
+        self.events = {}  # event id -> (start, end, event)
+        self._index = []  # sorted (start timestamp, event id)
+        self._max_duration = 0.0
+        self.window_start = None
+        self.sync_token = None
+        self.synced_at = None
+        self._sync_lock = None
+        self._sync_task = None
+        self.stats = {"full_syncs": 0, "incremental_syncs": 0, "hits": 0, "misses": 0}
+
+    def is_fresh(self):
+        return self.synced_at is not None and time.monotonic() - self.synced_at <= CALENDAR_MAX_STALENESS
+
+    def start(self):
+        """Seed the mirror and keep it syncing in the background; calls use the API until it is ready"""
+        if self.enabled and (self._sync_task is None or self._sync_task.done()):
+            self._sync_task = asyncio.create_task(self._sync_loop())
+
+    async def stop(self):
+        if self._sync_task and not self._sync_task.done():
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+
+    async def _sync_loop(self):
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.warning(f"Calendar mirror sync failed: {e}")
+            await asyncio.sleep(CALENDAR_SYNC_INTERVAL)
+
+    async def sync(self):
+        """Apply changes since the last sync, or reload everything when there is no valid token"""
+        if self._sync_lock is None:
+            self._sync_lock = asyncio.Lock()
+        async with self._sync_lock:
+            if self.sync_token:
+                try:
+                    await self._list(syncToken=self.sync_token)
+                    self.stats["incremental_syncs"] += 1
+                    return
+                except HttpError as e:
+                    if e.resp.status != 410:
+                        raise
+                    logger.info("Calendar sync token expired, running a full sync")
+            await self._full_sync()
+
+    async def _full_sync(self):
+        # Unrestricted listing: Calendar only issues a sync token for requests without timeMin;
+        # events that ended before the window are dropped as they arrive.
+        self.window_start = datetime.now().astimezone() - timedelta(days=CALENDAR_MIRROR_HISTORY_DAYS)
+        self.synced_at = None
+        self.events.clear()
+        self._index.clear()
+        self._max_duration = 0.0
+        self.sync_token = None
+        await self._list()
+        self.stats["full_syncs"] += 1
+
+    async def _list(self, **params):
+        service = self.service_factory()
+        while True:
+            response = await execute('calendar', service.events().list(
+                calendarId=self.calendar_id, singleEvents=True, showDeleted=True, maxResults=2500, **params
+            ))
+            for event in response.get('items', []):
+                if event.get('status') == 'cancelled':
+                    self.remove(event['id'])
+                else:
+                    self.upsert(event)
+            if not response.get('nextPageToken'):
+                break
+            params['pageToken'] = response['nextPageToken']
+        self.sync_token = response.get('nextSyncToken')
+        self.synced_at = time.monotonic()
+
+    def upsert(self, event):
+        """Add or replace an event (write-through from tool writes and sync results)"""
+        self.remove(event['id'])
+        start, end = _parse_time(event['start']), _parse_time(event['end'])
+        if self.window_start is not None and end <= self.window_start:
+            return
+        self.events[event['id']] = (start, end, event)
+        insort(self._index, (start.timestamp(), event['id']))
+        self._max_duration = max(self._max_duration, end.timestamp() - start.timestamp())
+
+    def remove(self, event_id):
+        entry = self.events.pop(event_id, None)
+        if entry is None:
+            return
+        i = bisect_left(self._index, (entry[0].timestamp(), event_id))
+        if i < len(self._index) and self._index[i][1] == event_id:
+            del self._index[i]
+
+    def covers(self, time_min):
+        return self.window_start is not None and time_min >= self.window_start
+
+    def query(self, time_min, max_results):
+        """Events ending after time_min ordered by start, like events.list(timeMin, orderBy=startTime)"""
+        threshold = time_min.timestamp()
+        # Events that started before time_min but are still running count too
+        i = bisect_left(self._index, (threshold - self._max_duration,))
+        results = []
+        for _, event_id in islice(self._index, i, None):
+            start, end, event = self.events[event_id]
+            if end.timestamp() > threshold:
+                results.append(event)
+                if len(results) >= max_results:
+                    break
+        return results
+
+    async def list_events(self, time_min, max_results):
+        """Events from memory when the mirror is fresh and covers the window, else None"""
+        if not self.enabled:
+            return None
+        # Normally started at server startup; never wait here for the first full listing
+        self.start()
+        start = datetime.fromisoformat(time_min.replace('Z', '+00:00'))
+        if not self.is_fresh() or not self.covers(start):
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return self.query(start, max_results)
@@ -3,11 +3,12 @@ import json
 
 async def get_current_datetime(params):
     """Get current date, time and timezone"""
-    now = datetime.now()
+    # Minute resolution: the result is memoized until the end of the current minute
+    now = datetime.now().replace(second=0, microsecond=0)
     
     return {
         "date": now.strftime("%Y-%m-%d"),
-        "time": now.strftime("%H:%M:%S"),
+        "time": now.strftime("%H:%M"),
         "datetime": now.isoformat(),
         "timezone": str(now.astimezone().tzinfo),
         "weekday": now.strftime("%A"),
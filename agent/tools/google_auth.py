@@ -0,0 +1,67 @@
+"""Google OAuth credentials and API clients held in memory, rebuilt only when the token secret rotates"""
+import json
+import os
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+import httplib2
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from aws_secrets import secrets_cache, GOOGLE_TOKEN_SECRET
+
+# Refresh access tokens this long before they expire so no tool call waits on a refresh mid-request
+REFRESH_MARGIN = timedelta(seconds=int(os.getenv('GOOGLE_REFRESH_MARGIN', '300')))
+HTTP_TIMEOUT = float(os.getenv('GOOGLE_HTTP_TIMEOUT', '10'))
+
+_token_info = None
+_credentials = {}  # scopes -> Credentials
+_services = {}  # (api, version, scopes) -> service
+_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+
+def _set_token(value):
+    global _token_info
+    with _lock:
+        _token_info = json.loads(value)
+        _credentials.clear()
+        _services.clear()
+
+def get_credentials(scopes):
+    """Shared credentials for the given scopes, from the cached secret or the local token file"""
+    key = tuple(scopes)
+    with _lock:
+        creds = _credentials.get(key)
+        if creds is None:
+            if _token_info is not None:
+                creds = Credentials.from_authorized_user_info(_token_info, scopes=list(scopes))
+            else:
+                token_path = os.getenv('GOOGLE_TOKEN_PATH', os.path.join(os.path.dirname(__file__), '..', 'token.json'))
+                creds = Credentials.from_authorized_user_file(token_path, scopes=list(scopes))
+            _credentials[key] = creds
+    return creds
+
+def refresh_if_expiring(creds):
+    """Refresh the access token ahead of expiry; blocking, so call it from a worker thread"""
+    # google-auth expiry is naive UTC
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    if creds.refresh_token and (not creds.expiry or creds.expiry - REFRESH_MARGIN <= now):
+        with _refresh_lock:
+            if not creds.expiry or creds.expiry - REFRESH_MARGIN <= now:
+                creds.refresh(Request())
+
+def get_service(api, version, scopes):
+    """Process-wide API client: static discovery document, in-memory credentials, keep-alive HTTP"""
+    key = (api, version, tuple(scopes))
+    service = _services.get(key)
+    if service is None:
+        creds = get_credentials(scopes)
+        http = AuthorizedHttp(creds, http=httplib2.Http(timeout=HTTP_TIMEOUT))
+        service = build(api, version, http=http, static_discovery=True, cache_discovery=False)
+        with _lock:
+            service = _services.setdefault(key, service)
+    return service
+
+secrets_cache.on_change(GOOGLE_TOKEN_SECRET, _set_token)
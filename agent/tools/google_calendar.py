@@ -1,11 +1,12 @@
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
 from datetime import datetime
 import json
 import os
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from config import TIMEZONE_OFFSET
+from .google_auth import get_service
+from .google_io import execute
+from .calendar_mirror import CalendarMirror
 
 def _ensure_timezone(datetime_str):
     """Add current timezone if not present in datetime string"""
@@ -25,10 +26,13 @@ def _ensure_timezone(datetime_str):
 
 def _get_calendar_service():
     """Get authenticated Google Calendar service"""
-    token_path = os.getenv('GOOGLE_TOKEN_PATH', os.path.join(os.path.dirname(__file__), '..', 'token.json'))
-    creds = Credentials.from_authorized_user_file(token_path, 
-        scopes=['https://www.googleapis.com/auth/calendar'])
-    return build('calendar', 'v3', credentials=creds)
+    return get_service('calendar', 'v3', ['https://www.googleapis.com/auth/calendar'])
+
+calendar_mirror = CalendarMirror(lambda: _get_calendar_service())
+
+def _format_event(e):
+    return {'title': e.get('summary', ''), 'start': e['start'].get('dateTime', e['start'].get('date')),
+            'end': e['end'].get('dateTime', e['end'].get('date')), 'event_id': e['id']}
 
 async def create_calendar_event(params):
     """Create a new calendar event"""
@@ -39,25 +43,29 @@ async def create_calendar_event(params):
         'end': {'dateTime': _ensure_timezone(params['end_time']), 'timeZone': params.get('timezone', 'Australia/Melbourne')},
         'description': params.get('description', '')
     }
-    result = service.events().insert(calendarId='primary', body=event).execute()
+    result = await execute('calendar', service.events().insert(calendarId='primary', body=event))
+    calendar_mirror.upsert(result)
     return {'event_id': result['id'], 'link': result['htmlLink']}
 
 async def list_calendar_events(params):
     """List upcoming calendar events"""
     print(params)
-    service = _get_calendar_service()
     time_min = params.get('start_date', datetime.now().isoformat())
     time_min = _ensure_timezone(time_min)
     max_results = params.get('max_results', 10)
     
-    events_result = service.events().list(
+    events = await calendar_mirror.list_events(time_min, max_results)
+    if events is not None:
+        return {'events': [_format_event(e) for e in events]}
+    
+    service = _get_calendar_service()
+    events_result = await execute('calendar', service.events().list(
         calendarId='primary', timeMin=time_min, maxResults=max_results,
         singleEvents=True, orderBy='startTime'
-    ).execute()
+    ))
 
     events = events_result.get('items', [])
-    return {'events': [{'title': e['summary'], 'start': e['start'].get('dateTime', e['start'].get('date')), 
-                        'end': e['end'].get('dateTime', e['end'].get('date')), 'event_id': e['id']} for e in events]}
+    return {'events': [_format_event(e) for e in events]}
 
 async def update_calendar_event(params):
     """Update an existing calendar event"""
@@ -65,7 +73,7 @@ async def update_calendar_event(params):
     event_id = params['event_id']
     
     # Get existing event
-    event = service.events().get(calendarId='primary', eventId=event_id).execute()
+    event = await execute('calendar', service.events().get(calendarId='primary', eventId=event_id))
     
     # Update fields if provided
     if 'title' in params:
@@ -77,7 +85,8 @@ async def update_calendar_event(params):
     if 'description' in params:
         event['description'] = params['description']
     
-    result = service.events().update(calendarId='primary', eventId=event_id, body=event).execute()
+    result = await execute('calendar', service.events().update(calendarId='primary', eventId=event_id, body=event))
+    calendar_mirror.upsert(result)
     return {'event_id': result['id'], 'link': result['htmlLink'], 'updated': True}
 
 async def delete_calendar_event(params):
@@ -85,7 +94,8 @@ async def delete_calendar_event(params):
     service = _get_calendar_service()
     event_id = params['event_id']
     
-    service.events().delete(calendarId='primary', eventId=event_id).execute()
+    await execute('calendar', service.events().delete(calendarId='primary', eventId=event_id))
+    calendar_mirror.remove(event_id)
     return {'event_id': event_id, 'deleted': True}
 
 def get_tool_definitions():
@@ -0,0 +1,65 @@
+"""
+Bounded worker pool for blocking Google API requests
+
+Requests are built on the event loop (pure CPU) and executed on a small
+thread pool with a per-thread keep-alive transport, a per-API concurrency
+limit and a timeout, so a slow Google response only delays the tool that
+is waiting on it.
+"""
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import httplib2
+from google_auth_httplib2 import AuthorizedHttp
+from .google_auth import HTTP_TIMEOUT, refresh_if_expiring
+
+GOOGLE_WORKERS = int(os.getenv('GOOGLE_WORKERS', '8'))
+GOOGLE_MAX_CONCURRENT = int(os.getenv('GOOGLE_MAX_CONCURRENT', '4'))  # Per API
+GOOGLE_CALL_TIMEOUT = float(os.getenv('GOOGLE_CALL_TIMEOUT', '15'))
+
+_executor = ThreadPoolExecutor(max_workers=GOOGLE_WORKERS, thread_name_prefix='google-api')
+_limits = {}
+_local = threading.local()
+# Per tool call: [round trips], set by count_round_trips()
+_round_trips = contextvars.ContextVar('google_round_trips', default=None)
+
+def count_round_trips():
+    """Start counting Google requests made in the current context; returns the counter"""
+    counter = [0]
+    _round_trips.set(counter)
+    return counter
+
+def _thread_http(shared_http):
+    """Transport owned by the current worker thread; httplib2 connections are not thread-safe"""
+    credentials = shared_http.credentials
+    transports = getattr(_local, 'transports', None)
+    if transports is None:
+        transports = _local.transports = {}
+    http = transports.get(id(credentials))
+    if http is None or http.credentials is not credentials:
+        http = transports[id(credentials)] = AuthorizedHttp(credentials, http=httplib2.Http(timeout=HTTP_TIMEOUT))
+    return http
+
+def _execute(request):
+    http = _thread_http(request.http)
+    refresh_if_expiring(http.credentials)
+    return request.execute(http=http)
+
+async def _limited(api, request):
+    limit = _limits.get(api)
+    if limit is None:
+        limit = _limits[api] = asyncio.Semaphore(GOOGLE_MAX_CONCURRENT)
+    async with limit:
+        return await asyncio.get_running_loop().run_in_executor(_executor, _execute, request)
+
+async def execute(api, request, timeout=GOOGLE_CALL_TIMEOUT):
+    """Execute a googleapiclient request on the worker pool"""
+    counter = _round_trips.get()
+    if counter is not None:
+        counter[0] += 1
+    try:
+        return await asyncio.wait_for(_limited(api, request), timeout)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"Google {api} request timed out after {timeout:.0f}s") from None
@@ -0,0 +1,68 @@
+"""
+Intent matching on caller transcripts for speculative tool calls
+
+The caller's final transcript arrives before the model decides to call a
+tool. Each rule looks for trigger words and, when they appear, names the
+read-only call the model is likely to make next so the bridge can warm it
+in the per-call tool cache. Rules are plain functions of the transcript's
+lower-cased word set and text, so other matchers can be plugged in
+alongside the keyword ones.
+"""
+import os
+import re
+from datetime import datetime, timedelta
+
+SPECULATION = os.getenv('SPECULATION', '1') == '1'
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+_WORD = re.compile(r"[a-z0-9']+")
+
+def spoken_date(words, today=None):
+    """Date named in the transcript (today, tomorrow, yesterday or an upcoming weekday), else None"""
+    today = today or datetime.now()
+    if 'tomorrow' in words:
+        return today + timedelta(days=1)
+    if 'yesterday' in words:
+        return today - timedelta(days=1)
+    for i, day in enumerate(WEEKDAYS):
+        if day in words:
+            return today + timedelta(days=(i - today.weekday()) % 7 or 7)
+    if 'today' in words or 'tonight' in words:
+        return today
+    return None
+
+def calendar_rule(words, text):
+    if not words & {'calendar', 'meeting', 'meetings', 'appointment', 'appointments', 'schedule',
+                    'busy', 'free', 'event', 'events', 'tomorrow', 'today'}:
+        return []
+    day = spoken_date(words)
+    if day is None or day.date() == datetime.now().date():
+        return [("list_calendar_events", {})]
+    return [("list_calendar_events", {"start_date": day.strftime('%Y-%m-%d')})]
+
+def notes_rule(words, text):
+    # Only reads: "add a note" leads to update_notes, which is not speculated
+    if not words & {'note', 'notes'} or words & {'add', 'write', 'save', 'remember', 'jot', 'take', 'put'}:
+        return []
+    day = spoken_date(words) or datetime.now()
+    return [("read_notes", {"date": day.strftime('%Y-%m-%d')})]
+
+RULES = [calendar_rule, notes_rule]
+
+class IntentMatcher:
+    """Maps a transcript to the (tool_name, params) calls the rules predict"""
+
+    def __init__(self, rules=RULES):
+        self.rules = list(rules)
+
+    def match(self, transcript):
+        if not SPECULATION:
+            return []
+        text = transcript.lower()
+        words = set(_WORD.findall(text))
+        calls = []
+        for rule in self.rules:
+            calls.extend(call for call in rule(words, text) if call not in calls)
+        return calls
+
+intent_matcher = IntentMatcher()
@@ -1,23 +1,107 @@
+"""
+Perplexity search over a pooled keep-alive session
+
+Requests reuse connections from a shared requests.Session, have connect
+and read timeouts, and run off the event loop. In streaming mode the
+answer is read as server-sent events; with SEARCH_MAX_SENTENCES set, the
+stream is closed once it has enough sentences for a spoken reply, which
+costs that pooled connection.
+"""
+import asyncio
+import json
 import os
+import re
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from metrics import CallbackMetric
+from .search_cache import SearchCache
 
-async def internet_search(query):
-    """Search the internet using Perplexity API"""
-    api_key = os.getenv("PERPLEXITY_API_KEY", "")
-    url = "https://api.perplexity.ai/chat/completions"
-    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
-    payload = {
+PERPLEXITY_URL = "https://api.perplexity.ai/chat/completions"
+SEARCH_CONNECT_TIMEOUT = float(os.getenv("SEARCH_CONNECT_TIMEOUT", "3"))
+SEARCH_READ_TIMEOUT = float(os.getenv("SEARCH_READ_TIMEOUT", "15"))
+SEARCH_POOL_SIZE = int(os.getenv("SEARCH_POOL_SIZE", "10"))
+SEARCH_STREAM = os.getenv("SEARCH_STREAM", "1") == "1"
+# Stop reading a streamed answer after this many sentences (0, the default, reads it all).
+# Closing a response mid-body means the pool drops that connection instead of reusing it.
+SEARCH_MAX_SENTENCES = int(os.getenv("SEARCH_MAX_SENTENCES", "0"))
+
+# Sentence-final punctuation (optionally followed by [n] citations) before whitespace and
+# a word that does not start in lower case, or the end of the text so far
+_SENTENCE_END = re.compile(r'(\w[\w.]*)?([.!?])(?:\[\d+\])*(?=\s*$|\s+[^\sa-z])')
+# Words whose trailing period does not end a sentence
+ABBREVIATIONS = {'mr', 'mrs', 'ms', 'dr', 'prof', 'st', 'jr', 'sr', 'mt', 'vs', 'etc', 'inc', 'ltd', 'co',
+                 'corp', 'no', 'approx', 'est', 'dept', 'gen', 'gov', 'sen', 'rep', 'jan', 'feb', 'mar',
+                 'apr', 'jun', 'jul', 'aug', 'sep', 'sept', 'oct', 'nov', 'dec'}
+
+def count_sentences(text):
+    """Sentence ends in text, not counting abbreviations ("Dr.", "U.S.") or single initials"""
+    count = 0
+    for match in _SENTENCE_END.finditer(text):
+        word = match.group(1) or ''
+        if match.group(2) == '.' and ('.' in word or len(word) == 1 or word.lower() in ABBREVIATIONS):
+            continue
+        count += 1
+    return count
+
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=SEARCH_POOL_SIZE))
+
+search_cache = SearchCache()
+CallbackMetric("voice_search_cache_lookups_total", "Search cache lookups by result",
+               lambda: {(r,): search_cache.stats[r] for r in ("hits", "misses", "coalesced")}, ("result",), "counter")
+CallbackMetric("voice_search_cache_saved_seconds_total", "Upstream search latency avoided by cache hits",
+               lambda: search_cache.stats["saved_seconds"], metric_type="counter")
+
+def _payload(query, stream):
+    return {
         "model": "sonar",
         "messages": [
             {"role": "system", "content": "Be precise and concise."},
-            {"role": "user", "content": query['query']}
+            {"role": "user", "content": query}
         ],
         "max_tokens": 500,
-        "temperature": 0.7
+        "temperature": 0.7,
+        "stream": stream
     }
-    response = requests.post(url, json=payload, headers=headers)
-    return response.json() if response.status_code == 200 else {"error": response.text}
+
+def _read_stream(response):
+    """Accumulate streamed deltas, stopping early once the answer has enough sentences"""
+    answer, citations, truncated = [], [], False
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            break
+        chunk = json.loads(data)
+        citations = chunk.get("citations", citations)
+        choice = (chunk.get("choices") or [{}])[0]
+        answer.append(choice.get("delta", {}).get("content") or "")
+        if choice.get("finish_reason"):
+            break
+        if SEARCH_MAX_SENTENCES and count_sentences("".join(answer)) >= SEARCH_MAX_SENTENCES:
+            truncated = True
+            break
+    return {"choices": [{"message": {"role": "assistant", "content": "".join(answer).strip()}}],
+            "citations": citations, "truncated": truncated}
+
+def _search(query, stream=SEARCH_STREAM):
+    api_key = os.getenv("PERPLEXITY_API_KEY", "")
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    try:
+        # Closing a fully read response returns its connection to the pool; only an
+        # early SEARCH_MAX_SENTENCES cutoff drops it
+        with _session.post(PERPLEXITY_URL, json=_payload(query, stream), headers=headers, stream=stream,
+                           timeout=(SEARCH_CONNECT_TIMEOUT, SEARCH_READ_TIMEOUT)) as response:
+            if response.status_code != 200:
+                return {"error": response.text}
+            return _read_stream(response) if stream else response.json()
+    except requests.Timeout:
+        return {"error": "Search timed out"}
+
+async def internet_search(query):
+    """Search the internet using Perplexity API"""
+    return await search_cache.get(query['query'], lambda: asyncio.to_thread(_search, query['query']))
 
 def get_tool_definition():
     """Return the tool definition for Nova Sonic"""
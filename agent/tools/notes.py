@@ -1,125 +1,119 @@
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
 from datetime import datetime
 import json
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaInMemoryUpload
 import os
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from config import TIMEZONE_OFFSET
-
-# Cache for folder ID
-_notes_folder_id = None
+from .google_auth import get_service
+from .google_io import execute
+from .notes_index import NotesIndex, DOCUMENT_MIME_TYPE
+from .notes_journal import NotesJournal
+from metrics import CallbackMetric
 
 def _get_services():
     """Get authenticated Google services"""
-    token_path = os.getenv('GOOGLE_TOKEN_PATH', os.path.join(os.path.dirname(__file__), '..', 'token.json'))
-    creds = Credentials.from_authorized_user_file(token_path,
-        scopes=['https://www.googleapis.com/auth/documents', 'https://www.googleapis.com/auth/drive.file'])
-    docs_service = build('docs', 'v1', credentials=creds)
-    drive_service = build('drive', 'v3', credentials=creds)
-    return docs_service, drive_service
+    scopes = ['https://www.googleapis.com/auth/documents', 'https://www.googleapis.com/auth/drive.file']
+    return get_service('docs', 'v1', scopes), get_service('drive', 'v3', scopes)
+
+notes_index = NotesIndex(lambda: _get_services()[1])
 
-def _get_notes_folder_id(drive_service):
+async def _get_notes_folder_id():
     """Find or create my_notes folder"""
-    global _notes_folder_id
-    
-    if _notes_folder_id:
-        return _notes_folder_id
-    
-    # Search for existing my_notes folder
-    query = "name='my_notes' and mimeType='application/vnd.google-apps.folder'"
-    results = drive_service.files().list(q=query, pageSize=1, fields="files(id)").execute()
-    files = results.get('files', [])
-    
-    if files:
-        _notes_folder_id = files[0]['id']
-    else:
-        # Create my_notes folder
-        folder_metadata = {
-            'name': 'my_notes',
-            'mimeType': 'application/vnd.google-apps.folder'
-        }
-        folder = drive_service.files().create(body=folder_metadata, fields='id').execute()
-        _notes_folder_id = folder['id']
-    
-    return _notes_folder_id
+    return await notes_index.get_folder_id()
 
-def _find_note_entry(drive_service, date_str):
+async def _find_note_entry(date_str):
     """Find note entry for a specific date"""
-    folder_id = _get_notes_folder_id(drive_service)
-    query = f"name='{date_str}' and mimeType='application/vnd.google-apps.document' and '{folder_id}' in parents"
-    
-    results = drive_service.files().list(q=query, pageSize=1, fields="files(id, name)").execute()
-    files = results.get('files', [])
-    return files[0]['id'] if files else None
+    return await notes_index.lookup(date_str)
 
-def _create_note_entry(docs_service, drive_service, date_str):
-    """Create a new note entry for a date"""
-    folder_id = _get_notes_folder_id(drive_service)
-    
-    # Create document in my_notes folder
-    doc = docs_service.documents().create(body={'title': date_str}).execute()
-    doc_id = doc['documentId']
+async def _get_document(docs_service, date_str, doc_id):
+    """Fetch an indexed document, dropping the index entry if it no longer exists"""
+    try:
+        return await execute('docs', docs_service.documents().get(documentId=doc_id))
+    except HttpError as e:
+        if e.resp.status != 404:
+            raise
+        notes_index.forget(date_str)
+        return None
+
+async def _create_note_entry(drive_service, date_str, text):
+    """Create a new note entry for a date, in the notes folder and with its first note, in one request"""
+    folder_id = await _get_notes_folder_id()
     
-    # Move to notes folder
-    drive_service.files().update(
-        fileId=doc_id,
-        addParents=folder_id,
-        fields='id, parents'
-    ).execute()
+    # Drive converts the plain-text upload into a Google Doc
+    metadata = {'name': date_str, 'mimeType': DOCUMENT_MIME_TYPE, 'parents': [folder_id]}
+    media = MediaInMemoryUpload(text.encode('utf-8'), mimetype='text/plain')
+    doc = await execute('drive', drive_service.files().create(body=metadata, media_body=media, fields='id'))
     
+    notes_index.add(date_str, doc['id'])
+    return doc['id']
+
+async def _append_to_note(docs_service, date_str, doc_id, text):
+    """Append at the end of the document body without reading it first; False if the document is gone"""
+    try:
+        await execute('docs', docs_service.documents().batchUpdate(
+            documentId=doc_id,
+            body={'requests': [{'insertText': {'endOfSegmentLocation': {}, 'text': text}}]}
+        ))
+        return True
+    except HttpError as e:
+        if e.resp.status != 404:
+            raise
+        notes_index.forget(date_str)
+        return False
+
+async def _write_note(date_str, text):
+    """Append to the existing entry, or create it with this text as its content"""
+    docs_service, drive_service = _get_services()
+    doc_id = await _find_note_entry(date_str)
+    if not doc_id or not await _append_to_note(docs_service, date_str, doc_id, f"\n\n{text}"):
+        doc_id = await _create_note_entry(drive_service, date_str, text)
     return doc_id
 
+notes_journal = NotesJournal(_write_note)
+CallbackMetric("voice_notes_journal_pending", "Journaled notes not yet written to Google Docs",
+               lambda: len(notes_journal.pending))
+
 async def read_notes(params):
     """Read notes entry for a specific date"""
-    docs_service, drive_service = _get_services()
+    docs_service, _ = _get_services()
     
     # Default to today if no date provided
     date_str = params.get('date', datetime.now().strftime('%Y-%m-%d'))
     
     # Find or create entry
-    doc_id = _find_note_entry(drive_service, date_str)
+    doc_id = await _find_note_entry(date_str)
+    doc = await _get_document(docs_service, date_str, doc_id) if doc_id else None
     
-    if not doc_id:
+    # Notes still waiting in the journal come after what is already in the document
+    unsynced = notes_journal.unsynced(date_str)
+    if doc is None and not unsynced:
         return {'date': date_str, 'content': '', 'message': 'No notes found for this date'}
     
     # Read content
-    doc = docs_service.documents().get(documentId=doc_id).execute()
-    content = '\n'.join([elem.get('paragraph', {}).get('elements', [{}])[0].get('textRun', {}).get('content', '') 
-                         for elem in doc.get('body', {}).get('content', [])])
+    content = ''
+    if doc is not None:
+        content = '\n'.join([elem.get('paragraph', {}).get('elements', [{}])[0].get('textRun', {}).get('content', '') 
+                             for elem in doc.get('body', {}).get('content', [])]).strip()
+    content = '\n\n'.join([content, *unsynced]) if content else '\n\n'.join(unsynced)
     
-    return {'date': date_str, 'content': content.strip()}
+    return {'date': date_str, 'content': content}
 
 async def update_notes(params):
     """Update notes entry for a specific date"""
-    docs_service, drive_service = _get_services()
-    
     # Default to today if no date provided
     date_str = params.get('date', datetime.now().strftime('%Y-%m-%d'))
     content = params['content']
     current_time = datetime.now().strftime('%H:%M:%S')
+    text = f"{current_time}: {content}"
     
-    # Find or create entry
-    doc_id = _find_note_entry(drive_service, date_str)
-    
-    if not doc_id:
-        doc_id = _create_note_entry(docs_service, drive_service, date_str)
-        # For new document, add content at the beginning
-        formatted_content = f"{current_time}: {content}"
-        insert_index = 1
-    else:
-        # For existing document, get the end index and append
-        doc = docs_service.documents().get(documentId=doc_id).execute()
-        end_index = doc.get('body', {}).get('content', [{}])[-1].get('endIndex', 1) - 1
-        formatted_content = f"\n\n{current_time}: {content}"
-        insert_index = end_index
-    
-    # Append content
-    docs_service.documents().batchUpdate(
-        documentId=doc_id,
-        body={'requests': [{'insertText': {'location': {'index': insert_index}, 'text': formatted_content}}]}
-    ).execute()
+    # Acknowledge once the note is durable locally; the journal syncer writes it to Docs
+    if notes_journal.enabled:
+        await notes_journal.append(date_str, text)
+        return {'date': date_str, 'updated': True}
     
+    doc_id = await _write_note(date_str, text)
     return {'date': date_str, 'doc_id': doc_id, 'updated': True}
 
 def get_tool_definitions():
@@ -0,0 +1,130 @@
+"""
+Persistent date -> document index for daily notes
+
+The my_notes folder id and each date's document id are kept in a small
+JSON file, populated by one paged folder listing the first time and kept
+current as notes are created. Entries are verified lazily: a document that
+turns out to be gone is dropped when a Docs call returns 404.
+"""
+import asyncio
+import json
+import logging
+import os
+from .google_io import execute
+
+logger = logging.getLogger(__name__)
+
+NOTES_INDEX_PATH = os.getenv('NOTES_INDEX_PATH', '/tmp/notes_index.json')
+FOLDER_NAME = 'my_notes'
+DOCUMENT_MIME_TYPE = 'application/vnd.google-apps.document'
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
+class NotesIndex:
+    """Maps note dates to Google Docs ids without a Drive query per call"""
+
+    def __init__(self, drive_factory, path=NOTES_INDEX_PATH):
+        self.drive_factory = drive_factory
+        self.path = path
+        self.folder_id = None
+        self.docs = {}  # 'YYYY-MM-DD' -> document id
+        self._loaded = False
+        self._load_lock = None
+        self._warm_task = None
+        self.stats = {"hits": 0, "misses": 0, "listings": 0}
+
+    def start(self):
+        """Load the index in the background so the first notes call does not pay for the listing"""
+        if self._warm_task is None or self._warm_task.done():
+            self._warm_task = asyncio.create_task(self._warm())
+
+    async def _warm(self):
+        try:
+            await self.load()
+        except Exception as e:
+            logger.warning(f"Could not load notes index: {e}")
+
+    async def load(self):
+        """Read the index file, or rebuild it from Drive when there is none"""
+        if self._loaded:
+            return
+        if self._load_lock is None:
+            self._load_lock = asyncio.Lock()
+        async with self._load_lock:
+            if self._loaded:
+                return
+            saved = await asyncio.to_thread(self._read)
+            if saved.get('folder_id'):
+                self.folder_id = saved['folder_id']
+                self.docs.update(saved.get('docs', {}))
+            else:
+                await self._rebuild()
+            self._loaded = True
+
+    async def _rebuild(self):
+        drive = self.drive_factory()
+        self.folder_id = await self._find_or_create_folder(drive)
+        query = f"'{self.folder_id}' in parents and mimeType='{DOCUMENT_MIME_TYPE}' and trashed=false"
+        params = {'q': query, 'pageSize': 1000, 'fields': 'nextPageToken, files(id, name)'}
+        docs = {}
+        while True:
+            results = await execute('drive', drive.files().list(**params))
+            for f in results.get('files', []):
+                docs.setdefault(f['name'], f['id'])
+            if not results.get('nextPageToken'):
+                break
+            params['pageToken'] = results['nextPageToken']
+        self.docs = docs
+        self.stats["listings"] += 1
+        self.save()
+
+    async def _find_or_create_folder(self, drive):
+        query = f"name='{FOLDER_NAME}' and mimeType='{FOLDER_MIME_TYPE}' and trashed=false"
+        results = await execute('drive', drive.files().list(q=query, pageSize=1, fields="files(id)"))
+        files = results.get('files', [])
+        if files:
+            return files[0]['id']
+        folder = await execute('drive', drive.files().create(
+            body={'name': FOLDER_NAME, 'mimeType': FOLDER_MIME_TYPE}, fields='id'))
+        return folder['id']
+
+    async def get_folder_id(self):
+        await self.load()
+        return self.folder_id
+
+    async def lookup(self, date_str):
+        """Document id for a date, asking Drive only when the index has no entry"""
+        await self.load()
+        doc_id = self.docs.get(date_str)
+        if doc_id:
+            self.stats["hits"] += 1
+            return doc_id
+        # Another worker may have created it since this index was written
+        self.stats["misses"] += 1
+        query = f"name='{date_str}' and mimeType='{DOCUMENT_MIME_TYPE}' and '{self.folder_id}' in parents and trashed=false"
+        results = await execute('drive', self.drive_factory().files().list(q=query, pageSize=1, fields="files(id)"))
+        files = results.get('files', [])
+        if files:
+            self.add(date_str, files[0]['id'])
+            return files[0]['id']
+        return None
+
+    def add(self, date_str, doc_id):
+        self.docs[date_str] = doc_id
+        self.save()
+
+    def forget(self, date_str):
+        if self.docs.pop(date_str, None):
+            self.save()
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def save(self):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'folder_id': self.folder_id, 'docs': self.docs}, f)
+        os.replace(tmp_path, self.path)
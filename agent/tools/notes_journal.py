@@ -0,0 +1,165 @@
+"""
+Write-behind journal for daily notes
+
+update_notes appends each note to a local JSONL file, fsynced per entry,
+and returns as soon as it is on disk. A background syncer flushes the
+journal to Google Docs in order, coalescing consecutive notes for the same
+date into one append and retrying with backoff while Google is unreachable.
+Entries still in the file at startup (after a crash or restart) are synced
+then; a crash between a Docs write and the journal rewrite can repeat that
+batch once.
+"""
+import asyncio
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+NOTES_JOURNAL = os.getenv('NOTES_JOURNAL', '0') == '1'
+NOTES_JOURNAL_PATH = os.getenv('NOTES_JOURNAL_PATH', '/tmp/notes_journal.jsonl')
+NOTES_JOURNAL_MAX_BACKOFF = float(os.getenv('NOTES_JOURNAL_MAX_BACKOFF', '60'))
+
+class NotesJournal:
+    """Durable queue of notes waiting to be written to Google Docs"""
+
+    def __init__(self, writer, path=NOTES_JOURNAL_PATH):
+        self.writer = writer  # async (date_str, text) -> None
+        self.path = path
+        self.enabled = NOTES_JOURNAL
+        self.pending = []  # [{'seq', 'date', 'text'}] in journal order
+        self._seq = 0
+        self._file = None
+        self._write_lock = None
+        self._wakeup = None
+        self._stopping = None
+        self._sync_task = None
+        self.stats = {"journaled": 0, "synced": 0, "failures": 0}
+
+    async def start(self):
+        """Open the journal, pick up entries left by a previous run and start the syncer"""
+        if not self.enabled or self._write_lock is not None:
+            return
+        # Each worker keeps its own journal so appends never interleave across processes
+        worker = os.getenv('WORKER_INDEX')
+        if worker is not None and os.getenv('WORKER_COUNT', '1') != '1':
+            self.path = f"{self.path}.{worker}"
+        self._write_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._stopping = asyncio.Event()
+        async with self._write_lock:
+            self.pending = await asyncio.to_thread(self._read)
+            self._seq = max((e['seq'] for e in self.pending), default=0)
+            # Rewriting drops a torn last line so new appends start on a clean line
+            await asyncio.to_thread(self._rewrite)
+        if self.pending:
+            logger.info(f"Notes journal has {len(self.pending)} unsynced entries")
+            self._wakeup.set()
+        self._sync_task = asyncio.create_task(self._sync_loop())
+
+    async def stop(self):
+        """Stop the syncer after one last flush attempt; anything unsynced stays in the file"""
+        if self._sync_task is None:
+            return
+        # Cancelling would not stop a Docs write already running in its thread,
+        # and flushing again after it would append that batch twice; so the
+        # syncer finishes its write, flushes what is left and exits by itself.
+        self._stopping.set()
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._sync_task), 5)
+        except asyncio.TimeoutError:
+            logger.warning(f"Notes journal not fully synced at shutdown, {len(self.pending)} entries left")
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+        self._sync_task = None
+        self._file.close()
+        self._file = None
+        self._write_lock = None
+
+    async def append(self, date_str, text):
+        """Journal a note; returns once it is fsynced to disk"""
+        await self.start()
+        async with self._write_lock:
+            self._seq += 1
+            entry = {'seq': self._seq, 'date': date_str, 'text': text}
+            await asyncio.to_thread(self._write, entry)
+            self.pending.append(entry)
+        self.stats["journaled"] += 1
+        self._wakeup.set()
+
+    def unsynced(self, date_str):
+        """Journaled notes for a date that are not in Google Docs yet"""
+        return [e['text'] for e in self.pending if e['date'] == date_str]
+
+    async def _sync_loop(self):
+        backoff = 1.0
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            try:
+                await self.flush()
+                backoff = 1.0
+                if self._stopping.is_set():
+                    return
+            except Exception as e:
+                self.stats["failures"] += 1
+                if self._stopping.is_set():
+                    logger.warning(f"Notes journal sync failed at shutdown, {len(self.pending)} entries left: {e}")
+                    return
+                logger.warning(f"Notes journal sync failed, retrying in {backoff:.0f}s: {e}")
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), backoff)
+                except asyncio.TimeoutError:
+                    pass
+                backoff = min(backoff * 2, NOTES_JOURNAL_MAX_BACKOFF)
+                self._wakeup.set()
+
+    async def flush(self):
+        """Write pending entries to Google Docs in journal order"""
+        while self.pending:
+            # Coalesce the run of consecutive entries for the same date into one write
+            batch = [self.pending[0]]
+            for entry in self.pending[1:]:
+                if entry['date'] != batch[0]['date']:
+                    break
+                batch.append(entry)
+            await self.writer(batch[0]['date'], '\n\n'.join(e['text'] for e in batch))
+            async with self._write_lock:
+                del self.pending[:len(batch)]
+                await asyncio.to_thread(self._rewrite)
+            self.stats["synced"] += len(batch)
+
+    def _read(self):
+        entries = []
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        logger.warning("Skipping torn notes journal line")
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _write(self, entry):
+        self._file.write(json.dumps(entry) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _rewrite(self):
+        """Replace the journal with the entries still pending"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            for entry in self.pending:
+                f.write(json.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self.path, 'a')
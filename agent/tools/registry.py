@@ -0,0 +1,28 @@
+"""
+Tool registry with reuse metadata
+
+Each tool is registered with what is safe to do with its results:
+whether it is idempotent (a repeat with the same arguments may reuse an
+earlier result), where a result is memoized ("call" for the current
+session, "process" for every call on the worker), for how long, and the
+data domain it reads or writes. A tool that is not idempotent invalidates
+the memoized results of its domain when it runs.
+"""
+
+# Tool name -> async function(params)
+TOOLS = {}
+# Tool name -> {"idempotent", "scope", "ttl", "domain"}
+TOOL_META = {}
+
+def register(name, fn, idempotent=False, scope="call", ttl=0, domain=None):
+    """Add a tool; ttl is the memo lifetime in seconds (0 never memoizes)"""
+    if scope not in ("call", "process"):
+        raise ValueError(f"Unknown cache scope for {name}: {scope}")
+    TOOLS[name] = fn
+    TOOL_META[name] = {"idempotent": idempotent, "scope": scope, "ttl": ttl, "domain": domain}
+
+def is_idempotent(name):
+    return name in TOOL_META and TOOL_META[name]["idempotent"]
+
+def domain_of(name):
+    return TOOL_META[name]["domain"] if name in TOOL_META else None
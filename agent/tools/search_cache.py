@@ -0,0 +1,110 @@
+"""
+Cross-call cache for internet search results
+
+Results are kept in an LRU keyed by the normalized query (case, punctuation,
+whitespace and articles folded away), each with a TTL from its freshness
+class: news, weather and prices expire in minutes, opening hours and
+schedules in an hour, everything else in a day. Concurrent misses for the
+same key share one upstream request.
+"""
+import asyncio
+import os
+import re
+import time
+from collections import OrderedDict
+
+SEARCH_CACHE = os.getenv('SEARCH_CACHE', '1') == '1'
+SEARCH_CACHE_SIZE = int(os.getenv('SEARCH_CACHE_SIZE', '512'))
+
+# Freshness class -> TTL in seconds; the first class whose words appear in the query applies
+FRESHNESS_TTL = {
+    'live': float(os.getenv('SEARCH_TTL_LIVE', '300')),
+    'daily': float(os.getenv('SEARCH_TTL_DAILY', '3600')),
+    'stable': float(os.getenv('SEARCH_TTL_STABLE', '86400')),
+}
+FRESHNESS_WORDS = {
+    'live': {'news', 'headline', 'headlines', 'latest', 'now', 'current', 'currently', 'today', 'tonight',
+             'weather', 'forecast', 'temperature', 'score', 'scores', 'price', 'prices', 'stock', 'traffic'},
+    'daily': {'open', 'opening', 'close', 'closing', 'hours', 'tomorrow', 'schedule', 'week', 'weekend', 'event', 'events'},
+}
+# Only articles are folded: tense and question words change the answer
+# ("who is" vs "who was"), so they stay in the key
+STOP_WORDS = {'a', 'an', 'the'}
+
+_NON_WORD = re.compile(r"[^\w\s]")
+
+def normalize(query):
+    """Cache key for a query: lower case, no punctuation, no articles, single spaces"""
+    words = _NON_WORD.sub('', query.lower()).split()
+    return ' '.join(w for w in words if w not in STOP_WORDS) or ' '.join(words)
+
+def freshness(key):
+    words = set(key.split())
+    for name, vocabulary in FRESHNESS_WORDS.items():
+        if words & vocabulary:
+            return name
+    return 'stable'
+
+class SearchCache:
+    """LRU + TTL cache with single-flight misses"""
+
+    def __init__(self, maxsize=SEARCH_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.enabled = SEARCH_CACHE
+        self._entries = OrderedDict()  # key -> (expires_at, result, fetch_seconds)
+        self._inflight = {}  # key -> Future of the shared request
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "saved_seconds": 0.0}
+
+    async def get(self, query, fetch):
+        """Cached result for query, or the result of fetch() (shared by concurrent callers)"""
+        if not self.enabled:
+            return await fetch()
+        key = normalize(query)
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None:
+            if entry[0] > now:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                self.stats["saved_seconds"] += entry[2]
+                return entry[1]
+            del self._entries[key]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats["coalesced"] += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The caller that owned the request was cancelled; fetch again
+                return await self.get(query, fetch)
+
+        self.stats["misses"] += 1
+        future = self._inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await fetch()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters see the error; keep it from being reported as never retrieved
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            del self._inflight[key]
+        fetch_seconds = time.monotonic() - now
+        if 'error' not in result:
+            self._store(key, result, fetch_seconds)
+        return result
+
+    def _store(self, key, result, fetch_seconds):
+        ttl = FRESHNESS_TTL[freshness(key)]
+        self._entries[key] = (time.monotonic() + ttl, result, fetch_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
@@ -0,0 +1,177 @@
+"""
+Per-call cache of prefetched tool results
+
+Most calls open with the model reading today's calendar and notes one
+call after another. The bridge starts those reads when the session opens,
+in parallel with stream setup, and speculatively starts others when the
+caller's transcript suggests them (see intents.py); when the model asks
+for the same thing the finished (or still running) prefetch is used
+instead of a new request. Calls are matched on the tool name and its
+arguments with defaults filled in, so `read_notes {}` and
+`read_notes {"date": today}` are the same call.
+ToolMemo keeps finished results of idempotent tools for the TTL and scope
+declared in the tool registry, until a write in the same domain.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from metrics import CallbackMetric
+from .registry import TOOL_META, is_idempotent, domain_of
+from .google_calendar import _ensure_timezone
+
+logger = logging.getLogger(__name__)
+
+# Tools prefetched at session start, called with default arguments ('' disables)
+PREFETCH_TOOLS = [t for t in os.getenv('PREFETCH_TOOLS', 'list_calendar_events,read_notes').split(',') if t]
+# Prefetched results older than this are not served
+PREFETCH_MAX_AGE = float(os.getenv('PREFETCH_MAX_AGE', '120'))
+
+def _calendar_args(params):
+    full = {"max_results": 10, **params}
+    if full.get("start_date"):
+        full["start_date"] = _ensure_timezone(full["start_date"])
+    return full
+
+# Per tool: arguments -> canonical arguments
+_CANONICAL = {
+    "read_notes": lambda params: {"date": datetime.now().strftime('%Y-%m-%d'), **params},
+    "list_calendar_events": _calendar_args,
+}
+
+# Process-scope memo entries shared by every call on the worker: key -> (expires_at, domain, result)
+_process_memo = {}
+MEMO_MAX_ENTRIES = 1024
+
+# Per source ("session" start prefetch or transcript "speculative"): outcome counts
+stats = {source: {"issued": 0, "hits": 0, "wasted": 0} for source in ("session", "speculative")}
+memo_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+def cache_key(tool_name, params):
+    """Tool name and arguments with defaults filled in"""
+    canonical = _CANONICAL.get(tool_name)
+    full = canonical(params) if canonical else params
+    return f"{tool_name}:{json.dumps(full, sort_keys=True)}"
+
+class ToolCache:
+    """Prefetched tool results for one call"""
+
+    def __init__(self, execute):
+        self.execute = execute  # async (tool_name, params) -> result
+        self._entries = {}  # key -> [task, started, used, source stats, domain]
+
+    def prefetch(self, tool_name, params=None, source="session"):
+        """Start a read-only tool call in the background"""
+        key = cache_key(tool_name, params or {})
+        if not is_idempotent(tool_name) or key in self._entries:
+            return
+        task = asyncio.create_task(self.execute(tool_name, params or {}))
+        task.add_done_callback(_log_failure)
+        self._entries[key] = [task, time.monotonic(), False, stats[source], domain_of(tool_name)]
+        stats[source]["issued"] += 1
+
+    def prefetch_session_start(self):
+        for tool_name in PREFETCH_TOOLS:
+            self.prefetch(tool_name)
+
+    def speculate(self, calls):
+        """Warm the (tool_name, params) calls an intent matcher expects the model to make"""
+        for tool_name, params in calls:
+            self.prefetch(tool_name, params, source="speculative")
+
+    async def get(self, tool_name, params):
+        """Prefetched result for this call, or None when there is no usable one"""
+        key = cache_key(tool_name, params)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        task, started, used, counts, _ = entry
+        if time.monotonic() - started > PREFETCH_MAX_AGE:
+            del self._entries[key]
+            self._discard(entry)
+            return None
+        entry[2] = True
+        try:
+            result = await asyncio.shield(task)
+        except Exception:
+            # A failed prefetch is not served; the caller runs the tool itself
+            self._entries.pop(key, None)
+            counts["wasted"] += not used
+            return None
+        counts["hits"] += not used
+        return result
+
+    def invalidate(self, domain=None):
+        """Drop prefetched results of a domain (all when None), e.g. after a tool call that writes"""
+        for key, entry in list(self._entries.items()):
+            if domain is None or entry[4] == domain:
+                del self._entries[key]
+                self._discard(entry)
+
+    def close(self):
+        """On hangup: drop every entry and cancel whatever is still running, served or not"""
+        for entry in self._entries.values():
+            task, _, used, counts, _ = entry
+            counts["wasted"] += not used
+            task.cancel()
+        self._entries.clear()
+
+    def _discard(self, entry):
+        task, _, used, counts, _ = entry
+        # A used task may still be awaited by the call it was served to
+        if not used:
+            counts["wasted"] += 1
+            task.cancel()
+
+class ToolMemo:
+    """Memoized results of idempotent tools for one call, plus the worker-wide process scope"""
+
+    def __init__(self):
+        self._entries = {}  # key -> (expires_at, domain, result)
+
+    def _store(self, meta):
+        return _process_memo if meta["scope"] == "process" else self._entries
+
+    def get(self, tool_name, params):
+        """Memoized result, or None"""
+        meta = TOOL_META.get(tool_name)
+        if not meta or not meta["idempotent"] or not meta["ttl"]:
+            return None
+        entry = self._store(meta).get(cache_key(tool_name, params))
+        if entry is None or entry[0] <= time.time():
+            memo_stats["misses"] += 1
+            return None
+        memo_stats["hits"] += 1
+        return entry[2]
+
+    def put(self, tool_name, params, result):
+        meta = TOOL_META.get(tool_name)
+        if not meta or not meta["idempotent"] or not meta["ttl"] or (isinstance(result, dict) and 'error' in result):
+            return
+        store = self._store(meta)
+        if len(store) >= MEMO_MAX_ENTRIES:
+            now = time.time()
+            for key in [k for k, entry in store.items() if entry[0] <= now]:
+                del store[key]
+        # Expire on wall-clock multiples of the TTL, so a 60s TTL holds a result for the current minute
+        ttl = meta["ttl"]
+        store[cache_key(tool_name, params)] = ((time.time() // ttl + 1) * ttl, meta["domain"], result)
+
+    def invalidate(self, domain):
+        """Drop this call's and the process-wide results of a domain"""
+        memo_stats["invalidations"] += 1
+        for store in (self._entries, _process_memo):
+            for key in [k for k, entry in store.items() if entry[1] == domain]:
+                del store[key]
+
+def _log_failure(task):
+    if not task.cancelled() and task.exception():
+        logger.info(f"Tool prefetch failed: {task.exception()}")
+
+CallbackMetric("voice_tool_prefetch_total", "Tool prefetches by source and outcome",
+               lambda: {(source, k): v for source, counts in stats.items() for k, v in counts.items()},
+               ("source", "result"), "counter")
+CallbackMetric("voice_tool_memo_total", "Tool memo lookups and invalidations",
+               lambda: {(k,): v for k, v in memo_stats.items()}, ("result",), "counter")
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Benchmark for list_calendar_events: per-call service build vs cached
+service vs the in-memory calendar mirror
+
+The per-call path is what the tool used to do on every invocation: read
+token.json, build Credentials, run discovery.build and open a new HTTP
+connection. The cached path is tools.google_auth.get_service. The mirror
+path answers from tools.calendar_mirror after its first sync.
+
+By default both paths talk to a local Calendar API stand-in so the numbers
+isolate client-side overhead plus one loopback round trip. BENCH_LIVE=1
+uses the real token (GOOGLE_TOKEN_PATH or agent/token.json) and Google.
+
+    python tests/bench_calendar.py
+    BENCH_CALLS=50 BENCH_LIVE=1 python tests/bench_calendar.py
+"""
+import asyncio
+import functools
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add agent directory to path to import tools
+AGENT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'agent')
+sys.path.append(AGENT_DIR)
+
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+
+CALLS = int(os.getenv("BENCH_CALLS", "30"))
+LIVE = os.getenv("BENCH_LIVE") == "1"
+SCOPES = ['https://www.googleapis.com/auth/calendar']
+
+
+class FakeCalendarHandler(BaseHTTPRequestHandler):
+    """Calendar events.list stand-in with HTTP/1.1 keep-alive and sync tokens"""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # Headers and body are separate writes
+    connections = set()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        FakeCalendarHandler.connections.add(self.client_address)
+        start = datetime.now(timezone.utc)
+        items = [{
+            "id": f"event{i}",
+            "summary": f"Event {i}",
+            "start": {"dateTime": (start + timedelta(hours=i)).isoformat()},
+            "end": {"dateTime": (start + timedelta(hours=i, minutes=30)).isoformat()}
+        } for i in range(10)]
+        if "syncToken=" in self.path:
+            items = []  # Nothing changed since the last sync
+        body = json.dumps({"kind": "calendar#events", "items": items, "nextSyncToken": "sync-1"}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_fake_calendar():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeCalendarHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def write_fake_token():
+    """Token that is valid for an hour, so neither path needs to refresh"""
+    token = {
+        "token": "fake-access-token",
+        "refresh_token": "fake-refresh-token",
+        "client_id": "fake-client",
+        "client_secret": "fake-secret",
+        "token_uri": "https://oauth2.googleapis.com/token",
+        "expiry": (datetime.now(timezone.utc) + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    }
+    handle, path = tempfile.mkstemp(suffix=".json")
+    with os.fdopen(handle, "w") as f:
+        json.dump(token, f)
+    return path
+
+
+def per_call_service(build_options):
+    """The previous _get_calendar_service: everything rebuilt per tool call"""
+    token_path = os.getenv('GOOGLE_TOKEN_PATH', os.path.join(AGENT_DIR, 'token.json'))
+    creds = Credentials.from_authorized_user_file(token_path, scopes=SCOPES)
+    return build('calendar', 'v3', credentials=creds, **build_options)
+
+
+async def measure(calls, mirror=False):
+    from tools import google_calendar
+
+    if mirror:
+        # As at server startup: seed the mirror before calls arrive
+        google_calendar.calendar_mirror.start()
+        while not google_calendar.calendar_mirror.is_fresh():
+            await asyncio.sleep(0.01)
+    latencies = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        await google_calendar.list_calendar_events({})
+        latencies.append((time.perf_counter() - started) * 1000)
+    if mirror:
+        await google_calendar.calendar_mirror.stop()
+    return latencies
+
+
+def report(name, latencies):
+    p95 = sorted(latencies)[int(len(latencies) * 0.95) - 1]
+    print(f"   {name}: first {latencies[0]:.2f} ms, median {statistics.median(latencies[1:] or latencies):.3f} ms, "
+          f"p95 {p95:.3f} ms")
+    return statistics.median(latencies[1:] or latencies)
+
+
+def main():
+    """Main benchmark function"""
+    build_options = {}
+    server = None
+    if not LIVE:
+        server = start_fake_calendar()
+        os.environ['GOOGLE_TOKEN_PATH'] = write_fake_token()
+        build_options = {"client_options": {"api_endpoint": f"http://127.0.0.1:{server.server_address[1]}/"}}
+
+    from tools import google_auth, google_calendar
+    google_auth.build = functools.partial(google_auth.build, **build_options)
+
+    print(f"🚀 list_calendar_events benchmark ({CALLS} calls, {'live Google' if LIVE else 'local stand-in'})\n")
+    cached_service = google_calendar._get_calendar_service
+    google_calendar.print = lambda *args, **kwargs: None  # The tool logs its params
+
+    google_calendar.calendar_mirror.enabled = False
+    google_calendar._get_calendar_service = lambda: per_call_service(build_options)
+    FakeCalendarHandler.connections.clear()
+    per_call = report("per-call build", asyncio.run(measure(CALLS)))
+    per_call_connections = len(FakeCalendarHandler.connections)
+
+    google_calendar._get_calendar_service = cached_service
+    FakeCalendarHandler.connections.clear()
+    cached = report("cached service", asyncio.run(measure(CALLS)))
+    cached_connections = len(FakeCalendarHandler.connections)
+
+    google_calendar.calendar_mirror.enabled = True
+    mirror = report("calendar mirror", asyncio.run(measure(CALLS, mirror=True)))
+
+    print(f"\n📊 Median speedup: cached service {per_call / cached:.1f}x, mirror {per_call / mirror:.0f}x")
+    if not LIVE:
+        print(f"   Connections opened: per-call {per_call_connections}, cached {cached_connections}")
+        server.shutdown()
+        os.unlink(os.environ['GOOGLE_TOKEN_PATH'])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
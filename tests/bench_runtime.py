@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the launcher runtime profiles
+
+Serves a websocket echo endpoint with one worker under each RUNTIME_PROFILE
+("asyncio", "default", "performance") and drives it with concurrent
+simulated calls sending 640-byte audio frames as fast as they are echoed.
+Frame work is deliberately trivial so loop and protocol overhead dominate;
+the result is echoed frames per second of server CPU time (frames/s/core).
+
+    python tests/bench_runtime.py
+    BENCH_PROFILES=asyncio,performance BENCH_CALLS=100 BENCH_SECONDS=5 python tests/bench_runtime.py
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+AGENT_DIR = os.path.join(os.path.dirname(TESTS_DIR), 'agent')
+
+PROFILES = os.getenv("BENCH_PROFILES", "asyncio,default,performance").split(",")
+CALLS = int(os.getenv("BENCH_CALLS", "50"))
+SECONDS = float(os.getenv("BENCH_SECONDS", "10"))
+CLIENT_PROCS = int(os.getenv("BENCH_CLIENT_PROCS", str(max(1, (os.cpu_count() or 2) - 1))))
+FRAME = bytes(640)
+
+# Echo endpoint, served by the launcher as "bench_runtime:app"
+app = FastAPI()
+
+
+@app.get("/cpu")
+async def cpu():
+    import launcher
+    options = launcher.runtime_options()
+    loop = type(asyncio.get_running_loop()).__module__
+    return {"cpu": time.process_time(), "loop": loop, "http": options.get("http", "auto")}
+
+
+@app.websocket("/ws")
+async def echo(websocket: WebSocket):
+    await websocket.accept()
+    try:
+        while True:
+            await websocket.send_bytes(await websocket.receive_bytes())
+    except WebSocketDisconnect:
+        pass
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(profile, port):
+    code = (
+        f"import sys; sys.path[:0] = [{TESTS_DIR!r}, {AGENT_DIR!r}]; "
+        f"import launcher; launcher.run('bench_runtime:app', host='127.0.0.1', port={port}, workers=1)"
+    )
+    env = dict(os.environ, RUNTIME_PROFILE=profile)
+    process = subprocess.Popen([sys.executable, "-c", code], env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            return process, server_info(port)
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("Server did not start")
+
+
+def server_info(port):
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/cpu", timeout=5) as response:
+        return json.loads(response.read())
+
+
+async def _simulated_call(url, seconds, counts):
+    import websockets
+
+    async with websockets.connect(url, max_size=None, compression=None) as ws:
+        end = time.perf_counter() + seconds
+        frames = 0
+        while time.perf_counter() < end:
+            await ws.send(FRAME)
+            await ws.recv()
+            frames += 1
+        counts.append(frames)
+
+
+def _client_process(url, calls, seconds, queue):
+    async def run():
+        counts = []
+        await asyncio.gather(*[_simulated_call(url, seconds, counts) for _ in range(calls)])
+        return sum(counts)
+    queue.put(asyncio.run(run()))
+
+
+def run_profile(profile):
+    port = _free_port()
+    server, info = start_server(profile, port)
+    try:
+        url = f"ws://127.0.0.1:{port}/ws"
+        ctx = multiprocessing.get_context("spawn")
+        queue = ctx.Queue()
+        shares = [CALLS // CLIENT_PROCS + (1 if i < CALLS % CLIENT_PROCS else 0) for i in range(CLIENT_PROCS)]
+        processes = [ctx.Process(target=_client_process, args=(url, share, SECONDS, queue)) for share in shares if share]
+        for process in processes:
+            process.start()
+        frames = sum(queue.get() for _ in processes)
+        for process in processes:
+            process.join()
+        cpu_seconds = server_info(port)["cpu"] - info["cpu"]
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return info, frames, cpu_seconds
+
+
+def main():
+    """Main benchmark function"""
+    print(f"🚀 Runtime profile benchmark ({CALLS} calls, {SECONDS:.0f}s each, {CLIENT_PROCS} client processes)\n")
+    results = []
+    for profile in PROFILES:
+        info, frames, cpu_seconds = run_profile(profile)
+        per_core = frames / cpu_seconds if cpu_seconds else 0.0
+        results.append((profile, per_core))
+        print(f"   {profile}: loop={info['loop']} http={info['http']}, {frames / SECONDS:.0f} frames/s, "
+              f"server CPU {cpu_seconds:.1f}s, {per_core:.0f} frames/s/core")
+
+    baseline = results[0][1]
+    print(f"\n📊 Frames per second per core (relative to {results[0][0]}):")
+    for profile, per_core in results:
+        print(f"   {profile}: {per_core:.0f} ({per_core / baseline:.2f}x)" if baseline else f"   {profile}: {per_core:.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark for background session teardown under load
+
+Simulates many calls hanging up at once against fake bridges whose
+end_session is slow, hangs or fails, and reports how many teardown tasks
+and sessions are still alive after hangup.
+"""
+import asyncio
+import gc
+import logging
+import random
+import sys
+import os
+import time
+
+# Add agent directory to path to import the reaper
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'agent'))
+
+from session_reaper import SessionReaper
+
+CALLS = int(os.getenv("BENCH_CALLS", "500"))
+
+# Individual teardown failures are expected here, only the totals matter
+logging.getLogger("session_reaper").setLevel(logging.ERROR)
+
+
+class FakeToolSupervisor:
+    def cancel_all(self):
+        pass
+
+
+class FakeBridge:
+    """Stand-in for NovaSonicBridge with a configurable teardown behaviour"""
+
+    def __init__(self, behaviour):
+        self.behaviour = behaviour
+        self.is_active = True
+        self.response = None
+        self.websocket = object()
+        self.audio_queue = asyncio.Queue()
+        self.tool_supervisor = FakeToolSupervisor()
+
+    async def end_audio_input(self):
+        if self.behaviour == "broken":
+            raise ConnectionResetError("stream already closed")
+
+    async def end_session(self):
+        self.is_active = False
+        if self.behaviour == "slow":
+            await asyncio.sleep(random.uniform(0.5, 2.0))
+        elif self.behaviour == "hang":
+            await asyncio.sleep(3600)
+        elif self.behaviour == "broken":
+            raise ConnectionResetError("stream already closed")
+
+
+async def fake_audio_responses(bridge):
+    while bridge.is_active:
+        await bridge.audio_queue.get()
+
+
+async def run(timeout):
+    reaper = SessionReaper(timeout=timeout, slow_threshold=1.0)
+    behaviours = ["fast"] * 6 + ["slow"] * 2 + ["hang", "broken"]
+    baseline_tasks = len(asyncio.all_tasks())
+
+    handler_times = []
+    teardowns = []
+    for _ in range(CALLS):
+        bridge = FakeBridge(random.choice(behaviours))
+        response_task = asyncio.create_task(fake_audio_responses(bridge))
+        started = time.perf_counter()
+        teardowns.append(reaper.reap(bridge, response_task))
+        handler_times.append(time.perf_counter() - started)
+        del bridge, response_task
+
+    print(f"   handler return time: max {max(handler_times) * 1000:.3f} ms, "
+          f"mean {sum(handler_times) / len(handler_times) * 1000:.3f} ms")
+
+    hangup = time.monotonic()
+    for checkpoint in (0.0, 1.0, timeout + 0.5):
+        await asyncio.sleep(max(0.0, hangup + checkpoint - time.monotonic()))
+        gc.collect()
+        print(f"   t+{checkpoint:.1f}s: pending teardowns={reaper.pending()}, "
+              f"alive sessions={reaper.alive_sessions()}, "
+              f"extra tasks={len(asyncio.all_tasks()) - baseline_tasks}")
+
+    await reaper.close()
+    gc.collect()
+    print(f"   stats: {reaper.stats}")
+    # Teardown failures are handled inside the reaper; a task that raises is a reaper bug
+    raised = [t.exception() for t in teardowns if not t.cancelled() and t.exception()]
+    for exc in raised[:3]:
+        print(f"   teardown task raised: {exc!r}")
+    print(f"   teardown tasks raised: {len(raised)}")
+    return reaper.pending() == 0 and reaper.alive_sessions() == 0 and not raised
+
+
+async def main():
+    """Main benchmark function"""
+    print(f"🚀 Hanging up {CALLS} simulated calls...\n")
+    clean = await run(timeout=float(os.getenv("TEARDOWN_TIMEOUT", "3")))
+
+    if clean:
+        print("\n🎉 All sessions released after teardown deadline")
+        return 0
+    else:
+        print("\n💥 Sessions or tasks still alive after teardown deadline, or teardowns raised")
+        return 1
+
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    sys.exit(exit_code)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Benchmark for multi-worker deployment mode
+
+Starts the launcher with 1, 2, 4 and 8 workers serving a synthetic call
+endpoint that does the same per-frame work as the Nova Sonic bridge
+(base64 + event JSON for inbound audio, 24kHz -> 16kHz resample for
+outbound audio), then ramps up simulated calls sending 20ms frames until
+frame latency breaks down. Reports the highest sustained call count.
+
+    python tests/bench_workers.py
+    BENCH_WORKERS=1,2 BENCH_STEPS=50,100,200 BENCH_SECONDS=5 python tests/bench_workers.py
+"""
+import asyncio
+import base64
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+AGENT_DIR = os.path.join(os.path.dirname(TESTS_DIR), 'agent')
+
+WORKER_COUNTS = [int(n) for n in os.getenv("BENCH_WORKERS", "1,2,4,8").split(",")]
+CALL_STEPS = [int(n) for n in os.getenv("BENCH_STEPS", "25,50,100,200,400,800").split(",")]
+STEP_SECONDS = float(os.getenv("BENCH_SECONDS", "10"))
+CLIENT_PROCS = int(os.getenv("BENCH_CLIENT_PROCS", str(max(1, (os.cpu_count() or 2) // 2))))
+FRAME_INTERVAL = 0.02
+FRAME = bytes(640)
+P95_BUDGET_MS = float(os.getenv("BENCH_P95_BUDGET_MS", "60"))
+
+# Synthetic call endpoint, served by the launcher as "bench_workers:app"
+app = FastAPI()
+
+try:
+    from scipy import signal
+
+    def _resample(audio_bytes, from_rate=24000, to_rate=16000):
+        audio_data = np.frombuffer(audio_bytes, dtype=np.int16)
+        resampled = signal.resample(audio_data, int(len(audio_data) * to_rate / from_rate))
+        return resampled.astype(np.int16).tobytes()
+except ImportError:
+    def _resample(audio_bytes, from_rate=24000, to_rate=16000):
+        audio_data = np.frombuffer(audio_bytes, dtype=np.int16)
+        positions = np.linspace(0, len(audio_data) - 1, int(len(audio_data) * to_rate / from_rate))
+        return np.interp(positions, np.arange(len(audio_data)), audio_data).astype(np.int16).tobytes()
+
+
+@app.websocket("/ws")
+async def synthetic_call(websocket: WebSocket):
+    await websocket.accept()
+    model_chunk = bytes(960 * 2)
+    try:
+        while True:
+            frame = await websocket.receive_bytes()
+            blob = base64.b64encode(frame).decode('utf-8')
+            event = f'{{"event":{{"audioInput":{{"promptName":"p","contentName":"c","content":"{blob}"}}}}}}'
+            json.loads(event)
+            await websocket.send_bytes(_resample(model_chunk)[:len(frame)])
+    except WebSocketDisconnect:
+        pass
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers, port):
+    code = (
+        f"import sys; sys.path[:0] = [{TESTS_DIR!r}, {AGENT_DIR!r}]; "
+        f"import launcher; launcher.run('bench_workers:app', host='127.0.0.1', port={port}, workers={workers})"
+    )
+    process = subprocess.Popen([sys.executable, "-c", code], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            time.sleep(1.0 + 0.25 * workers)  # Let every worker finish binding
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("Server did not start")
+
+
+async def _simulated_call(url, seconds, latencies, failures):
+    import websockets
+
+    try:
+        async with websockets.connect(url, max_size=None, compression=None) as ws:
+            end = time.perf_counter() + seconds
+            next_send = time.perf_counter()
+            while next_send < end:
+                await asyncio.sleep(max(0.0, next_send - time.perf_counter()))
+                sent = time.perf_counter()
+                await ws.send(FRAME)
+                await ws.recv()
+                latencies.append((time.perf_counter() - sent) * 1000)
+                next_send += FRAME_INTERVAL
+    except Exception:
+        failures.append(1)
+
+
+def _client_process(url, calls, seconds, queue):
+    async def run():
+        latencies, failures = [], []
+        await asyncio.gather(*[_simulated_call(url, seconds, latencies, failures) for _ in range(calls)])
+        return latencies, len(failures)
+    queue.put(asyncio.run(run()))
+
+
+def run_step(url, calls, seconds):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    shares = [calls // CLIENT_PROCS + (1 if i < calls % CLIENT_PROCS else 0) for i in range(CLIENT_PROCS)]
+    processes = [ctx.Process(target=_client_process, args=(url, share, seconds, queue)) for share in shares if share]
+    for process in processes:
+        process.start()
+    latencies, failures = [], 0
+    for _ in processes:
+        step_latencies, step_failures = queue.get()
+        latencies.extend(step_latencies)
+        failures += step_failures
+    for process in processes:
+        process.join()
+
+    expected_frames = calls * seconds / FRAME_INTERVAL
+    delivered = len(latencies) / expected_frames if expected_frames else 0
+    p95 = float(np.percentile(latencies, 95)) if latencies else float("inf")
+    return p95, delivered, failures
+
+
+def main():
+    """Main benchmark function"""
+    print(f"🚀 Multi-worker benchmark ({os.cpu_count()} cores, {CLIENT_PROCS} client processes)\n")
+    results = []
+    for workers in WORKER_COUNTS:
+        port = _free_port()
+        server = start_server(workers, port)
+        url = f"ws://127.0.0.1:{port}/ws"
+        sustained, sustained_p95 = 0, None
+        try:
+            for calls in CALL_STEPS:
+                p95, delivered, failures = run_step(url, calls, STEP_SECONDS)
+                ok = p95 <= P95_BUDGET_MS and delivered >= 0.95 and failures == 0
+                print(f"   workers={workers} calls={calls}: p95={p95:.1f} ms, "
+                      f"delivered={delivered:.1%}, failures={failures} {'✅' if ok else '❌'}")
+                if not ok:
+                    break
+                sustained, sustained_p95 = calls, p95
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+        results.append((workers, sustained, sustained_p95))
+
+    print(f"\n📊 Sustained concurrent calls (p95 frame latency <= {P95_BUDGET_MS:.0f} ms):")
+    for workers, sustained, p95 in results:
+        latency = f"{p95:.1f} ms" if p95 is not None else "-"
+        print(f"   {workers} worker(s): {sustained} calls (p95 {latency})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Test script for the restaurant table inventory
+"""
+import asyncio
+import sys
+import os
+import threading
+
+# Add restaurant demo directory to path to import the inventory
+# (ahead of agent/, which has its own tools package, when run together with other tests)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'agent-restaurant-demo'))
+
+from inventory import SlotInventory
+
+DATE = '2026-02-14'
+
+def make_inventory(hold_ttl=120):
+    return SlotInventory({DATE: {
+        '18:00': {2: 1, 4: 1},
+        '18:30': {4: 1},
+        '19:00': {},
+        '19:30': {6: 1},
+        '20:00': {2: 2},
+        '21:00': {8: 1},
+    }}, hold_ttl=hold_ttl)
+
+def test_party_size_lookup():
+    """Only tables that seat the party count"""
+    print("🍽️  Testing party-size-aware availability...")
+
+    try:
+        inv = make_inventory()
+        assert inv.available(DATE, '18:00', 2) == 2
+        assert inv.available(DATE, '18:00', 3) == 1
+        assert inv.available(DATE, '20:00', 3) == 0
+        assert inv.available(DATE, '21:00', 7) == 1
+        print("✅ Success: Availability respects party size")
+        return True
+    except AssertionError as e:
+        print(f"❌ Error: {e!r}")
+        return False
+
+def test_nearest_alternatives():
+    """Nearest open times that seat the party, nearest first"""
+    print("\n🕰️  Testing nearest alternatives...")
+
+    try:
+        inv = make_inventory()
+        assert inv.nearest(DATE, '19:00', 2) == ['18:30', '19:30', '18:00'], inv.nearest(DATE, '19:00', 2)
+        assert inv.nearest(DATE, '19:00', 5) == ['19:30', '21:00']
+        assert inv.nearest(DATE, '20:00', 8, n=1) == ['21:00']
+        assert inv.nearest_slots(DATE, '19:10', n=2) == ['19:00', '19:30']
+        print("✅ Success: Alternatives are the nearest fitting times")
+        return True
+    except AssertionError as e:
+        print(f"❌ Error: {e!r}")
+        return False
+
+def test_hold_commit_release():
+    """Holds take the smallest fitting table; releases and expiry give it back"""
+    print("\n📌 Testing hold, commit and release...")
+
+    try:
+        inv = make_inventory()
+        hold = inv.hold(DATE, '18:00', 2)
+        assert inv.table_of(hold) == 2
+        assert inv.commit(hold)
+        assert inv.available(DATE, '18:00', 2) == 1
+
+        hold = inv.hold(DATE, '18:30', 4)
+        assert inv.nearest(DATE, '19:00', 3) == ['19:30', '18:00', '21:00']
+        inv.release(hold)
+        assert not inv.commit(hold)
+        assert inv.available(DATE, '18:30', 4) == 1
+        assert inv.nearest(DATE, '19:00', 3)[0] == '18:30'
+
+        expiring = make_inventory(hold_ttl=0)
+        hold = expiring.hold(DATE, '21:00', 8)
+        assert expiring.available(DATE, '21:00', 8) == 1
+        assert not expiring.commit(hold)
+        print("✅ Success: Holds commit, release and expire")
+        return True
+    except AssertionError as e:
+        print(f"❌ Error: {e!r}")
+        return False
+
+def test_concurrent_booking():
+    """Hundreds of threads booking the same evening never overbook"""
+    print("\n🧵 Testing concurrent holds...")
+
+    inv = SlotInventory({DATE: {'19:00': {2: 20, 4: 30, 6: 10}}})
+    held = []
+    start = threading.Barrier(300)
+
+    def book(party_size):
+        start.wait()
+        hold = inv.hold(DATE, '19:00', party_size)
+        if hold and inv.commit(hold):
+            held.append(party_size)
+
+    threads = [threading.Thread(target=book, args=(2 + i % 5,)) for i in range(300)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    ok = len(held) == 60 and inv.available(DATE, '19:00', 1) == 0 and inv.stats['rejected'] == 240
+    print(f"{'✅ Success' if ok else '❌ Error'}: {len(held)} bookings for 60 tables")
+    return ok
+
+def test_concurrent_reservations():
+    """Concurrent create_reservation calls on one event loop never overbook"""
+    print("\n📞 Testing concurrent reservations...")
+
+    from inventory import inventory
+    from tools.reservation import create_reservation
+
+    date = '2026-02-10'
+    tables = inventory.available(date, '19:00', 1) + inventory.available(date, '18:30', 1)
+
+    async def book_all():
+        return await asyncio.gather(*(
+            create_reservation({'date': date, 'time': time, 'party_size': 2, 'name': f'Caller {i}'})
+            for i, time in enumerate(['19:00', '18:30'] * 100)
+        ))
+
+    results = asyncio.run(book_all())
+    booked = sum(1 for r in results if r.get('success'))
+    ok = booked == tables and inventory.available(date, '19:00', 1) == 0
+    print(f"{'✅ Success' if ok else '❌ Error'}: {booked} of 200 calls booked {tables} free tables")
+    return ok
+
+def main():
+    """Main test function"""
+    print("🚀 Starting inventory tests...\n")
+
+    results = {
+        'Party size lookup': test_party_size_lookup(),
+        'Nearest alternatives': test_nearest_alternatives(),
+        'Hold, commit and release': test_hold_commit_release(),
+        'Concurrent holds': test_concurrent_booking(),
+        'Concurrent reservations': test_concurrent_reservations(),
+    }
+
+    print(f"\n📊 Test Results:")
+    for name, passed in results.items():
+        print(f"   {name}: {'✅ PASS' if passed else '❌ FAIL'}")
+
+    if all(results.values()):
+        print("\n🎉 All tests passed!")
+        return 0
+    else:
+        print("\n💥 Some tests failed!")
+        return 1
+
+if __name__ == "__main__":
+    exit_code = main()
+    sys.exit(exit_code)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for worker identity in multi-worker mode
+
+Spawns real workers through the launcher the way server.py does. A
+spawned child imports this module again before the worker target runs,
+just as it re-imports the server module, so module-level reads of
+WORKER_INDEX/WORKER_COUNT here see exactly what the app's modules see.
+Every worker must see its own identity from that first import.
+"""
+import multiprocessing
+import os
+import sys
+
+# Add agent directory to path to import the launcher
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'agent'))
+
+from launcher import spawn_worker
+
+WORKERS = 3
+
+# Read at import, like any module of the app
+IMPORTED_INDEX = os.getenv("WORKER_INDEX")
+IMPORTED_COUNT = os.getenv("WORKER_COUNT")
+
+
+def report(queue, index):
+    """Worker target: send back what this module saw at import"""
+    queue.put({"index": index, "imported_index": IMPORTED_INDEX, "imported_count": IMPORTED_COUNT})
+
+
+def test_spawned_worker_identity():
+    """Spawned workers know their identity from their first import"""
+    print("👷 Testing spawned worker identity...")
+
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    processes = [spawn_worker(ctx, report, (queue, index), index, WORKERS) for index in range(WORKERS)]
+    reports = sorted((queue.get(timeout=60) for _ in processes), key=lambda r: r["index"])
+    for process in processes:
+        process.join(timeout=10)
+
+    ok = True
+    for worker in reports:
+        if worker["imported_index"] != str(worker["index"]) or worker["imported_count"] != str(WORKERS):
+            print(f"❌ Error: worker {worker['index']} imported with WORKER_INDEX={worker['imported_index']} "
+                  f"WORKER_COUNT={worker['imported_count']}")
+            ok = False
+
+    if os.getenv("WORKER_INDEX") != IMPORTED_INDEX or os.getenv("WORKER_COUNT") != IMPORTED_COUNT:
+        print("❌ Error: spawning workers changed the parent's environment")
+        ok = False
+
+    if ok:
+        print(f"✅ Success: {WORKERS} workers each saw their own identity at import")
+    return ok
+
+
+def main():
+    """Main test function"""
+    print("🚀 Starting worker tests...\n")
+
+    passed = test_spawned_worker_identity()
+
+    print(f"\n📊 Test Results:")
+    print(f"   Spawned worker identity: {'✅ PASS' if passed else '❌ FAIL'}")
+
+    if passed:
+        print("\n🎉 All tests passed!")
+        return 0
+    else:
+        print("\n💥 Some tests failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())